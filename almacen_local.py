@@ -0,0 +1,474 @@
+# --- ALMACÉN LOCAL (SQLITE) CON SINCRONIZACIÓN DIFERIDA ---
+# Las lecturas salen de una base SQLite embebida y las escrituras se aplican en local y se
+# apuntan en una cola persistente (outbox). Un hilo en segundo plano la vacía contra
+# Supabase y trae los cambios remotos, así la app funciona aunque la conexión falle.
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    import httpx
+    ERRORES_RED = (ConnectionError, TimeoutError, OSError, httpx.TransportError)
+except ImportError:
+    ERRORES_RED = (ConnectionError, TimeoutError, OSError)
+
+# SQLSTATE de Postgres que rechazan los datos en sí (22: datos no válidos, 23: restricciones
+# como claves ajenas o únicas). Reintentar no sirve y la operación se aparta a conflictos;
+# cualquier otro error (5xx de PostgREST, JWT caducado, red) se reintenta más tarde.
+CLASES_RECHAZO = ("22", "23")
+
+
+class FilaAusente(Exception):
+    # La fila que se quería actualizar ya no existe en Supabase
+    pass
+
+
+def es_rechazo(error):
+    if isinstance(error, FilaAusente): return True
+    return str(getattr(error, "code", "") or "")[:2] in CLASES_RECHAZO
+
+# tabla -> (clave primaria, {columna: tipo}); las columnas JSON se guardan como texto
+ESQUEMA = {
+    "alumnos": ("id", {"id": "INTEGER", "nombre": "TEXT", "curso": "TEXT"}),
+    "configuracion_items": ("letra", {"letra": "TEXT", "descripcion": "TEXT", "nivel_1": "TEXT",
+                                      "nivel_2": "TEXT", "nivel_3": "TEXT", "nivel_4": "TEXT"}),
+    "evaluaciones_alumnos": ("id", {"id": "INTEGER", "alumno_id": "INTEGER", "nombre_alumno": "TEXT",
+                                    "puntos": "JSON", "fecha": "TEXT"}),
+    "items_autoevaluacion": ("id", {"id": "INTEGER", "nombre": "TEXT"}),
+    "autoevaluaciones": ("id", {"id": "INTEGER", "fecha": "TEXT", "sda": "INTEGER",
+                                "items_evaluados": "JSON", "reflexion_final": "JSON", "actualizado": "TEXT"}),
+}
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS ix_alumnos_curso ON alumnos (curso, nombre)",
+    "CREATE INDEX IF NOT EXISTS ix_eval_fecha ON evaluaciones_alumnos (fecha)",
+    "CREATE INDEX IF NOT EXISTS ix_eval_alumno_fecha ON evaluaciones_alumnos (nombre_alumno, fecha)",
+    "CREATE INDEX IF NOT EXISTS ix_eval_alumnoid_fecha ON evaluaciones_alumnos (alumno_id, fecha)",
+    "CREATE INDEX IF NOT EXISTS ix_auto_fecha ON autoevaluaciones (fecha)",
+    "CREATE INDEX IF NOT EXISTS ix_auto_actualizado ON autoevaluaciones (actualizado)",
+]
+# Claves ajenas a ids de otra tabla: al reasignar un id temporal también se cambian aquí
+DEPENDIENTES = {"alumnos": [("evaluaciones_alumnos", "alumno_id")]}
+# (tabla, columna) -> tabla cuyos ids guarda; 'id' de cada tabla apunta a la propia tabla
+REFERENCIAS = {(t_dep, col): tabla for tabla, deps in DEPENDIENTES.items() for t_dep, col in deps}
+# Tablas grandes que se bajan por incrementos: las altas por id creciente y, si tienen marca
+# de modificación, los cambios por esa columna. Las demás (catálogos pequeños) se copian enteras.
+INCREMENTALES = {"evaluaciones_alumnos": None, "autoevaluaciones": "actualizado"}
+LOTE_REMOTO = 1000  # filas por respuesta (PostgREST corta en 1000 por defecto)
+LOTE_IDS = 200      # ids por filtro in_ (van en la URL)
+OPERADORES = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "is_": "IS"}
+
+
+class AlmacenLocal:
+    # Mismo interfaz que BackendSupabase, para que el Repositorio pueda usar cualquiera
+    def __init__(self, ruta="registro_docente.db"):
+        self.db = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            for tabla, (pk, cols) in ESQUEMA.items():
+                defs = ", ".join(f"{c} {'TEXT' if t == 'JSON' else t}{' PRIMARY KEY' if c == pk else ''}" for c, t in cols.items())
+                self.db.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({defs})")
+                # Bases creadas con un esquema anterior: se añaden las columnas nuevas
+                existentes = {r["name"] for r in self.db.execute(f"PRAGMA table_info({tabla})")}
+                for c, t in cols.items():
+                    if c not in existentes: self.db.execute(f"ALTER TABLE {tabla} ADD COLUMN {c} {'TEXT' if t == 'JSON' else t}")
+            for sql in INDICES: self.db.execute(sql)
+            self.db.execute("""CREATE TABLE IF NOT EXISTS outbox (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla TEXT, op TEXT, datos TEXT, filtros TEXT, intentos INTEGER DEFAULT 0, creado REAL)""")
+            # Ids temporales ya sincronizados, por si la app aún tiene alguno en memoria
+            self.db.execute("CREATE TABLE IF NOT EXISTS ids (tabla TEXT, temporal INTEGER, definitivo INTEGER, PRIMARY KEY (tabla, temporal))")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS conflictos (seq INTEGER, tabla TEXT, op TEXT,
+                datos TEXT, filtros TEXT, error TEXT, instante REAL)""")
+            # Última marca de modificación remota ya bajada, por tabla
+            self.db.execute("CREATE TABLE IF NOT EXISTS marcas (tabla TEXT PRIMARY KEY, valor TEXT)")
+
+    # --- Traducción a SQL ---
+    def _columnas(self, tabla, columnas):
+        cols = ESQUEMA[tabla][1]
+        if columnas.strip() == "*": return list(cols)
+        pedidas = [c.strip() for c in columnas.split(",")]
+        for c in pedidas:
+            if c not in cols: raise ValueError(f"Columna desconocida: {tabla}.{c}")
+        return pedidas
+
+    def _where(self, tabla, filtros):
+        cols, partes, args = ESQUEMA[tabla][1], [], []
+        for op, col, valor in filtros:
+            if col not in cols: raise ValueError(f"Columna desconocida: {tabla}.{col}")
+            if op == "in_":
+                valor = list(valor)
+                if not valor: partes.append("0"); continue
+                partes.append(f"{col} IN ({', '.join('?' * len(valor))})"); args += valor
+            else:
+                # is_ lleva el texto "null", como en supabase-py
+                partes.append(f"{col} {OPERADORES[op]} ?"); args.append(None if op == "is_" and valor == "null" else valor)
+        return (" WHERE " + " AND ".join(partes) if partes else ""), args
+
+    def _origen(self, tabla, col):
+        return tabla if col == "id" else REFERENCIAS.get((tabla, col))
+
+    def _resolver(self, tabla, filtros):
+        # Filtros por id temporal ya sincronizado (propio o de una clave ajena) -> id definitivo
+        return [(op, col, self._id_vigente(origen, v) if (origen := self._origen(tabla, col)) else v)
+                for op, col, v in filtros]
+
+    def _resolver_fila(self, tabla, fila):
+        # Claves ajenas con id temporal ya sincronizado (el 'id' propio lo trata quien escribe)
+        return {k: self._id_vigente(REFERENCIAS[(tabla, k)], v) if (tabla, k) in REFERENCIAS else v for k, v in fila.items()}
+
+    def _id_vigente(self, tabla, valor):
+        if isinstance(valor, (list, tuple)): return [self._id_vigente(tabla, v) for v in valor]
+        if not (isinstance(valor, int) and valor < 0): return valor
+        r = self.db.execute("SELECT definitivo FROM ids WHERE tabla = ? AND temporal = ?", (tabla, valor)).fetchone()
+        return r[0] if r else valor
+
+    def _a_fila(self, tabla, r):
+        cols = ESQUEMA[tabla][1]
+        return {k: (json.loads(r[k]) if cols[k] == "JSON" and r[k] is not None else r[k]) for k in r.keys()}
+
+    def _a_sql(self, tabla, fila):
+        cols = ESQUEMA[tabla][1]
+        return {k: (json.dumps(v, ensure_ascii=False) if cols[k] == "JSON" and v is not None else v)
+                for k, v in fila.items() if k in cols}
+
+    # --- Lecturas ---
+    def consultar(self, tabla, columnas="*", filtros=(), orden=None, desc=False, rango=None):
+        # Los ids se resuelven con el lock cogido: el sincronizador puede estar reasignándolos
+        cols = self._columnas(tabla, columnas)
+        with self.lock:
+            where, args = self._where(tabla, self._resolver(tabla, filtros))
+            sql = f"SELECT {', '.join(cols)} FROM {tabla}{where}"
+            if orden:
+                self._columnas(tabla, orden)
+                sql += f" ORDER BY {orden} {'DESC' if desc else 'ASC'}"
+            if rango:
+                sql += " LIMIT ? OFFSET ?"; args += [rango[1] - rango[0] + 1, rango[0]]
+            return [self._a_fila(tabla, r) for r in self.db.execute(sql, args)]
+
+    def contar(self, tabla, filtros=()):
+        with self.lock:
+            where, args = self._where(tabla, self._resolver(tabla, filtros))
+            return self.db.execute(f"SELECT COUNT(*) FROM {tabla}{where}", args).fetchone()[0]
+
+    # --- Escrituras locales + outbox ---
+    def _apuntar(self, tabla, op, datos=None, filtros=()):
+        self.db.execute("INSERT INTO outbox (tabla, op, datos, filtros, creado) VALUES (?, ?, ?, ?, ?)",
+                        (tabla, op, json.dumps(datos, ensure_ascii=False), json.dumps(list(filtros)), time.time()))
+
+    def _id_temporal(self, tabla):
+        # Ids negativos hasta que Supabase asigne el definitivo
+        # (nunca se reutilizan: también cuentan los ya reasignados)
+        en_tabla = self.db.execute(f"SELECT MIN(id) FROM {tabla}").fetchone()[0] or 0
+        en_ids = self.db.execute("SELECT MIN(temporal) FROM ids WHERE tabla = ?", (tabla,)).fetchone()[0] or 0
+        return min(en_tabla, en_ids, 0) - 1
+
+    def _guardar(self, tabla, fila, reemplazar):
+        fila = self._a_sql(tabla, fila)
+        verbo = "INSERT OR REPLACE" if reemplazar else "INSERT"
+        self.db.execute(f"{verbo} INTO {tabla} ({', '.join(fila)}) VALUES ({', '.join('?' * len(fila))})", list(fila.values()))
+
+    def _escribir_filas(self, tabla, filas, op):
+        pk = ESQUEMA[tabla][0]
+        filas = [dict(f) for f in (filas if isinstance(filas, list) else [filas])]
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                for f in filas:
+                    f.update(self._resolver_fila(tabla, f))
+                    if pk == "id": f["id"] = self._id_temporal(tabla) if f.get("id") is None else self._id_vigente(tabla, f["id"])
+                    if op == "upsert":
+                        previa = self.db.execute(f"SELECT * FROM {tabla} WHERE {pk} = ?", (f[pk],)).fetchone()
+                        if previa: f = {**self._a_fila(tabla, previa), **f}
+                    self._guardar(tabla, f, op == "upsert")
+                self._apuntar(tabla, op, filas)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+        return filas
+
+    def insertar(self, tabla, filas):
+        return self._escribir_filas(tabla, filas, "insert")
+
+    def upsert(self, tabla, filas):
+        return self._escribir_filas(tabla, filas, "upsert")
+
+    def actualizar(self, tabla, datos, filtros):
+        with self.lock:
+            datos, filtros = self._resolver_fila(tabla, datos), self._resolver(tabla, filtros)
+            sets = self._a_sql(tabla, datos)
+            where, args = self._where(tabla, filtros)
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute(f"UPDATE {tabla} SET {', '.join(f'{k} = ?' for k in sets)}{where}", list(sets.values()) + args)
+                self._apuntar(tabla, "update", datos, filtros)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+            return self.consultar(tabla, filtros=filtros)
+
+    def borrar(self, tabla, filtros):
+        with self.lock:
+            filtros = self._resolver(tabla, filtros)
+            where, args = self._where(tabla, filtros)
+            borradas = self.consultar(tabla, filtros=filtros)
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute(f"DELETE FROM {tabla}{where}", args)
+                self._apuntar(tabla, "delete", None, filtros)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+        return borradas
+
+    # --- Soporte para el sincronizador ---
+    def siguiente(self, despues_de=0):
+        with self.lock:
+            r = self.db.execute("SELECT * FROM outbox WHERE seq > ? ORDER BY seq LIMIT 1", (despues_de,)).fetchone()
+            return dict(r) if r else None
+
+    def n_pendientes(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def confirmar(self, seq):
+        with self.lock:
+            self.db.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+
+    def reintentar(self, seq):
+        with self.lock:
+            self.db.execute("UPDATE outbox SET intentos = intentos + 1 WHERE seq = ?", (seq,))
+
+    def apartar(self, ent, error):
+        # La operación no se puede aplicar en remoto: se guarda para revisión y se sigue
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.execute("INSERT INTO conflictos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (ent["seq"], ent["tabla"], ent["op"], ent["datos"], ent["filtros"], str(error), time.time()))
+            self.db.execute("DELETE FROM outbox WHERE seq = ?", (ent["seq"],))
+            self.db.execute("COMMIT")
+
+    def conflictos(self):
+        with self.lock:
+            return [dict(r) for r in self.db.execute("SELECT * FROM conflictos ORDER BY instante DESC")]
+
+    def reasignar_id(self, tabla, temporal, definitivo):
+        # Cambia un id temporal por el de Supabase en la tabla, en las filas que lo referencian
+        # (p. ej. evaluaciones_alumnos.alumno_id) y en las operaciones pendientes, todo a la vez
+        def cambiar(v): return definitivo if v == temporal else v
+        cols = {tabla: "id", **{t: c for t, c in DEPENDIENTES.get(tabla, [])}}
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute(f"UPDATE {tabla} SET id = ? WHERE id = ?", (definitivo, temporal))
+                for t_dep, col in DEPENDIENTES.get(tabla, []):
+                    self.db.execute(f"UPDATE {t_dep} SET {col} = ? WHERE {col} = ?", (definitivo, temporal))
+                self.db.execute("INSERT OR REPLACE INTO ids VALUES (?, ?, ?)", (tabla, temporal, definitivo))
+                marcas = ",".join("?" * len(cols))
+                for r in self.db.execute(f"SELECT seq, tabla, datos, filtros FROM outbox WHERE tabla IN ({marcas})", list(cols)).fetchall():
+                    col = cols[r["tabla"]]
+                    filtros = []
+                    for op, c, v in json.loads(r["filtros"]):
+                        if c == col: v = [cambiar(x) for x in v] if op == "in_" else cambiar(v)
+                        filtros.append([op, c, v])
+                    datos = json.loads(r["datos"])
+                    for f in (datos if isinstance(datos, list) else [datos] if isinstance(datos, dict) else []):
+                        if col in f: f[col] = cambiar(f[col])
+                    self.db.execute("UPDATE outbox SET datos = ?, filtros = ? WHERE seq = ?",
+                                    (json.dumps(datos, ensure_ascii=False), json.dumps(filtros), r["seq"]))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+
+    def con_pendientes(self, tabla):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM outbox WHERE tabla = ? LIMIT 1", (tabla,)).fetchone() is not None
+
+    def firma(self, tabla):
+        # (nº de filas, id máximo) de las filas que ya existen en remoto (id positivo)
+        with self.lock:
+            n, mx = self.db.execute(f"SELECT COUNT(*), MAX(id) FROM {tabla} WHERE id > 0").fetchone()
+            return n, mx or 0
+
+    def ids(self, tabla):
+        with self.lock:
+            return {r[0] for r in self.db.execute(f"SELECT id FROM {tabla} WHERE id > 0")}
+
+    def marca(self, tabla):
+        with self.lock:
+            r = self.db.execute("SELECT valor FROM marcas WHERE tabla = ?", (tabla,)).fetchone()
+            return r[0] if r else None
+
+    def fusionar(self, tabla, filas, marca=None):
+        # Filas remotas nuevas o cambiadas; como reemplazar_tabla, no se aplica con escrituras sin subir
+        with self.lock:
+            if self.con_pendientes(tabla): return False
+            self.db.execute("BEGIN")
+            try:
+                for f in filas: self._guardar(tabla, f, True)
+                if marca is not None: self.db.execute("INSERT OR REPLACE INTO marcas VALUES (?, ?)", (tabla, marca))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+            return True
+
+    def conservar_ids(self, tabla, ids):
+        # Borra las filas ya sincronizadas que no están en 'ids' (borradas en remoto)
+        with self.lock:
+            if self.con_pendientes(tabla): return False
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute("CREATE TEMP TABLE IF NOT EXISTS _ids_remotos (id INTEGER PRIMARY KEY)")
+                self.db.execute("DELETE FROM _ids_remotos")
+                self.db.executemany("INSERT INTO _ids_remotos VALUES (?)", ((i,) for i in ids))
+                self.db.execute(f"DELETE FROM {tabla} WHERE id > 0 AND id NOT IN (SELECT id FROM _ids_remotos)")
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+            return True
+
+    def reemplazar_tabla(self, tabla, filas):
+        # Copia remota completa; no se toca si hay escrituras locales sin subir
+        with self.lock:
+            if self.db.execute("SELECT 1 FROM outbox WHERE tabla = ? LIMIT 1", (tabla,)).fetchone(): return False
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute(f"DELETE FROM {tabla}")
+                for f in filas: self._guardar(tabla, f, False)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+            return True
+
+
+class Sincronizador:
+    # Vacía la outbox contra Supabase en orden y después refresca las tablas desde remoto
+    def __init__(self, almacen, cliente, intervalo=10):
+        self.almacen, self.cliente, self.intervalo = almacen, cliente, intervalo
+        self.ultimo_error = None
+        self.ultima_sync = None
+        self._despertar = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name="sincronizador", daemon=True)
+            self._hilo.start()
+        return self
+
+    def avisar(self):
+        # Sincronizar cuanto antes (tras una escritura)
+        self._despertar.set()
+
+    def _bucle(self):
+        espera = self.intervalo
+        while True:
+            ok = self.sincronizar()
+            # Espera exponencial mientras no haya red
+            espera = self.intervalo if ok else min(espera * 2, 300)
+            self._despertar.wait(espera); self._despertar.clear()
+
+    def sincronizar(self):
+        try:
+            self.subir()
+            self.bajar()
+        except ERRORES_RED as e:
+            self.ultimo_error = f"Sin conexión: {e}"
+            return False
+        except Exception as e:
+            # Cualquier otro fallo se muestra y se reintenta: el hilo no puede morir
+            self.ultimo_error = f"Error al sincronizar: {type(e).__name__}: {e}"
+            return False
+        self.ultimo_error, self.ultima_sync = None, time.time()
+        return True
+
+    def subir(self):
+        # Se relee cada operación: la anterior puede haber reasignado ids en las siguientes
+        ent = self.almacen.siguiente()
+        while ent is not None:
+            tabla, op = ent["tabla"], ent["op"]
+            datos, filtros = json.loads(ent["datos"]), [tuple(f) for f in json.loads(ent["filtros"])]
+            try:
+                if op in ("insert", "upsert"):
+                    self._subir_filas(tabla, op, datos)
+                elif op == "update":
+                    q = self.cliente.table(tabla).update(datos)
+                    for o, c, v in filtros: q = getattr(q, o)(c, v)
+                    if not q.execute().data:
+                        # Alguien la borró en remoto: gana el borrado
+                        raise FilaAusente("La fila ya no existe en Supabase")
+                else:
+                    q = self.cliente.table(tabla).delete()
+                    for o, c, v in filtros: q = getattr(q, o)(c, v)
+                    q.execute()
+            except Exception as e:
+                # Solo un rechazo de los datos la aparta; lo demás se reintenta sin perder el orden
+                if not es_rechazo(e):
+                    self.almacen.reintentar(ent["seq"]); raise
+                self.almacen.apartar(ent, e)
+            else:
+                self.almacen.confirmar(ent["seq"])
+            ent = self.almacen.siguiente(ent["seq"])
+
+    def _subir_filas(self, tabla, op, filas):
+        temporales = [f.get("id") for f in filas]
+        enviar = [{k: v for k, v in f.items() if not (k == "id" and isinstance(v, int) and v < 0)} for f in filas]
+        if op == "insert":
+            res = self.cliente.table(tabla).insert(enviar).execute().data
+        else:
+            # Las filas con id temporal aún no existen en remoto: se insertan
+            nuevas = [f for f, t in zip(enviar, temporales) if isinstance(t, int) and t < 0]
+            res = self.cliente.table(tabla).insert(nuevas).execute().data if nuevas else []
+            resto = [f for f, t in zip(enviar, temporales) if not (isinstance(t, int) and t < 0)]
+            if resto: self.cliente.table(tabla).upsert(resto).execute()
+            temporales = [t for t in temporales if isinstance(t, int) and t < 0]
+        for t, remota in zip(temporales, res):
+            if isinstance(t, int) and t < 0: self.almacen.reasignar_id(tabla, t, remota["id"])
+
+    def _paginas(self, tabla, columnas="*", filtros=()):
+        # Lectura por lotes ordenados por id (cada respuesta trae como mucho LOTE_REMOTO filas)
+        res, ultimo = [], None
+        while True:
+            q = self.cliente.table(tabla).select(columnas)
+            for o, c, v in filtros: q = getattr(q, o)(c, v)
+            if ultimo is not None: q = q.gt("id", ultimo)
+            lote = q.order("id").limit(LOTE_REMOTO).execute().data
+            res += lote
+            if len(lote) < LOTE_REMOTO: return res
+            ultimo = lote[-1]["id"]
+
+    def bajar(self):
+        for tabla, (pk, _) in ESQUEMA.items():
+            if self.almacen.con_pendientes(tabla): continue
+            if tabla in INCREMENTALES:
+                self._bajar_incremental(tabla, INCREMENTALES[tabla])
+            else:
+                filas = self._paginas(tabla) if pk == "id" else self.cliente.table(tabla).select("*").execute().data
+                self.almacen.reemplazar_tabla(tabla, filas)
+
+    def _bajar_incremental(self, tabla, col_marca):
+        # Una consulta ligera (recuento e id máximo) decide qué hay que bajar
+        n_local, max_local = self.almacen.firma(tabla)
+        r = self.cliente.table(tabla).select("id", count="exact").order("id", desc=True).limit(1).execute()
+        n_remoto, max_remoto = r.count or 0, (r.data[0]["id"] if r.data else 0)
+        marca = self.almacen.marca(tabla) if col_marca else None
+        if col_marca and marca is None:
+            nuevas = self._paginas(tabla)  # primera vez: copia completa para fijar la marca
+        else:
+            nuevas = self._paginas(tabla, filtros=[("gt", "id", max_local)]) if max_remoto > max_local else []
+            if marca: nuevas += self._paginas(tabla, filtros=[("gte", col_marca, marca)])
+        if col_marca:
+            marca = max((f[col_marca] for f in nuevas if f.get(col_marca)), default=marca)
+        if not self.almacen.fusionar(tabla, nuevas, marca): return
+        if self.almacen.firma(tabla)[0] == n_remoto: return
+        # Los recuentos no cuadran (borrados o altas fuera de orden): se comparan solo los ids
+        remotos = {f["id"] for f in self._paginas(tabla, "id")}
+        faltan = sorted(remotos - self.almacen.ids(tabla))
+        filas = [f for k in range(0, len(faltan), LOTE_IDS)
+                 for f in self._paginas(tabla, filtros=[("in_", "id", faltan[k:k + LOTE_IDS])])]
+        if self.almacen.conservar_ids(tabla, remotos): self.almacen.fusionar(tabla, filas)
+
+    def estado(self):
+        return {"pendientes": self.almacen.n_pendientes(), "conflictos": len(self.almacen.conflictos()),
+                "ultimo_error": self.ultimo_error, "ultima_sync": self.ultima_sync}
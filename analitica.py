@@ -0,0 +1,132 @@
+# --- ANALÍTICA DE PROGRESO ---
+# Convierte los 'puntos' de evaluaciones_alumnos en arrays compactos (alumno, letra, fecha,
+# nivel) y calcula medias, tendencias y distribuciones con operaciones vectorizadas.
+# La matriz se actualiza de forma incremental: solo se procesan las evaluaciones con id nuevo.
+import numpy as np
+import pandas as pd
+
+
+def _codificar(valores, indice, etiquetas):
+    # Asigna un código entero estable a cada valor, ampliando el índice con los nuevos
+    inv, uniq = pd.factorize(valores)
+    codigos = np.empty(len(uniq), dtype=np.int32)
+    for k, v in enumerate(uniq):
+        if v not in indice:
+            indice[v] = len(etiquetas); etiquetas.append(v)
+        codigos[k] = indice[v]
+    return codigos[inv]
+
+
+def _sumar(filas, cols, valores, forma):
+    # Suma y cuenta agrupadas por (fila, columna) con un único bincount sobre el índice plano
+    plano = filas.astype(np.int64) * forma[1] + cols
+    suma = np.bincount(plano, weights=valores, minlength=forma[0] * forma[1]).reshape(forma)
+    n = np.bincount(plano, minlength=forma[0] * forma[1]).reshape(forma)
+    return suma, n
+
+
+class MatrizProgreso:
+    def __init__(self):
+        self.alumnos, self.letras, self.fechas = [], [], []
+        self._i_alumno, self._i_letra, self._i_fecha = {}, {}, {}
+        # Formato largo: una entrada por (evaluación, letra)
+        self.alumno = np.empty(0, np.int32)
+        self.letra = np.empty(0, np.int16)
+        self.fecha = np.empty(0, np.int32)
+        self.nivel = np.empty(0, np.int8)
+        self.max_id = 0            # id más alto procesado (los ids solo crecen)
+        self.n_evaluaciones = 0
+        self._cubo = None
+
+    def desde(self):
+        # Filtro para pedir solo lo nuevo, sea cual sea su fecha (una evaluación atrasada también)
+        return [("gt", "id", self.max_id)] if self.max_id else []
+
+    def actualizar(self, evaluaciones):
+        # evaluaciones: filas con id, alumno_id, puntos y fecha, ya resueltas con el roster
+        # (solo las de alumnos que ya no existen llegan sin alumno_id y cuentan por nombre_alumno)
+        # Devuelve cuántas eran nuevas
+        nuevas = [e for e in evaluaciones if e['id'] > self.max_id]
+        if not nuevas: return 0
+        self.max_id = max(e['id'] for e in nuevas)
+        self.n_evaluaciones += len(nuevas)
+        self._cubo = None
+
+        con_puntos = [e for e in nuevas if isinstance(e.get('puntos'), dict) and e['puntos']]
+        if con_puntos: self._anadir(con_puntos)
+        return len(nuevas)
+
+    def _anadir(self, nuevas):
+        df = pd.DataFrame.from_records([e['puntos'] for e in nuevas])
+        df["_alumno"] = [e['alumno_id'] if e.get('alumno_id') is not None else e['nombre_alumno'] for e in nuevas]
+        df["_fecha"] = [e['fecha'][:10] for e in nuevas]
+        largo = df.melt(id_vars=["_alumno", "_fecha"], var_name="_letra", value_name="_nivel")
+        nivel = pd.to_numeric(largo["_nivel"], errors="coerce")
+        valido = nivel.between(1, 4).to_numpy()
+        largo, nivel = largo[valido], nivel[valido]
+
+        self.alumno = np.concatenate([self.alumno, _codificar(largo["_alumno"], self._i_alumno, self.alumnos)])
+        self.letra = np.concatenate([self.letra, _codificar(largo["_letra"], self._i_letra, self.letras).astype(np.int16)])
+        self.fecha = np.concatenate([self.fecha, _codificar(largo["_fecha"], self._i_fecha, self.fechas)])
+        self.nivel = np.concatenate([self.nivel, nivel.to_numpy(np.int8)])
+
+    # --- Vistas derivadas ---
+    def orden_fechas(self):
+        # Las fechas se codifican por orden de llegada; esto da su orden cronológico
+        return np.argsort(np.array(self.fechas, dtype="datetime64[D]"), kind="stable")
+
+    def cubo(self):
+        # alumno x letra x fecha (cronológica), 0 = sin evaluar
+        if self._cubo is None:
+            rango = np.empty(len(self.fechas), np.int32)
+            rango[self.orden_fechas()] = np.arange(len(self.fechas), dtype=np.int32)
+            self._cubo = np.zeros((len(self.alumnos), len(self.letras), len(self.fechas)), np.int8)
+            self._cubo[self.alumno, self.letra, rango[self.fecha]] = self.nivel
+        return self._cubo
+
+    def fechas_ordenadas(self):
+        return pd.to_datetime(np.array(self.fechas, dtype="datetime64[D]")[self.orden_fechas()])
+
+    def medias(self):
+        # Media por alumno y letra (DataFrame alumnos x letras)
+        suma, n = _sumar(self.alumno, self.letra, self.nivel, (len(self.alumnos), len(self.letras)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame(suma / n, index=self.alumnos, columns=self.letras)
+
+    def tendencias(self):
+        # Pendiente (niveles por evaluación) por alumno y letra, por mínimos cuadrados sobre el cubo
+        c = self.cubo().astype(np.float32)
+        m = c > 0
+        t = np.broadcast_to(np.arange(c.shape[2], dtype=np.float32), c.shape)
+        n = m.sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t_med = np.where(m, t, 0).sum(axis=2) / n
+            y_med = c.sum(axis=2) / n
+            dt = np.where(m, t - t_med[..., None], 0)
+            dy = np.where(m, c - y_med[..., None], 0)
+            pend = (dt * dy).sum(axis=2) / (dt * dt).sum(axis=2)
+        pend[n < 2] = np.nan
+        return pd.DataFrame(pend, index=self.alumnos, columns=self.letras)
+
+    def evolucion_alumno(self, alumno):
+        # Niveles del alumno por fecha (filas) y letra (columnas), solo fechas con evaluación
+        c = self.cubo()[self._i_alumno[alumno]].T.astype(np.float32)
+        c[c == 0] = np.nan
+        df = pd.DataFrame(c, index=self.fechas_ordenadas(), columns=self.letras)
+        return df.dropna(how="all")
+
+    def evolucion_grupos(self, grupo_de):
+        # Media de todas las letras por grupo (p. ej. curso) y fecha; grupo_de: alumno -> grupo
+        grupos = pd.Categorical([grupo_de(a) for a in self.alumnos])
+        g = grupos.codes[self.alumno]
+        rango = np.empty(len(self.fechas), np.int32)
+        rango[self.orden_fechas()] = np.arange(len(self.fechas), dtype=np.int32)
+        f = rango[self.fecha]
+        suma, n = _sumar(g, f, self.nivel, (len(grupos.categories), len(self.fechas)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame((suma / n).T, index=self.fechas_ordenadas(), columns=list(grupos.categories))
+
+    def distribucion(self):
+        # Nº de evaluaciones por letra y nivel (letras x niveles 1-4)
+        cuenta = np.bincount(self.letra.astype(np.int64) * 5 + self.nivel, minlength=len(self.letras) * 5)
+        return pd.DataFrame(cuenta.reshape(-1, 5)[:, 1:], index=self.letras, columns=[f"N{k}" for k in range(1, 5)])
@@ -0,0 +1,53 @@
+# --- BENCHMARK: ANALÍTICA DE PROGRESO ---
+# 100.000 evaluaciones sintéticas (500 alumnos x 200 fechas, 12 letras). Mide la carga
+# inicial, una actualización incremental con un día nuevo y los cálculos vectorizados.
+#   python benchmarks/bench_analitica.py
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analitica import MatrizProgreso
+
+N_ALUMNOS, N_FECHAS, LETRAS = 500, 200, [chr(65 + i) for i in range(12)]
+CURSOS = ["INF 3", "INF 4", "INF 5", "1º", "2º", "3º", "4º", "5º", "6º"]
+
+
+def evaluaciones(n_alumnos, fechas, id_ini=1):
+    rng = np.random.default_rng(0)
+    niveles = rng.integers(1, 5, size=(len(fechas) * n_alumnos, len(LETRAS)))
+    evs, k = [], 0
+    for f in fechas:
+        for a in range(n_alumnos):
+            evs.append({"id": id_ini + k, "nombre_alumno": f"Alumno {a:03d} ({CURSOS[a % len(CURSOS)]})",
+                        "fecha": f, "puntos": dict(zip(LETRAS, niveles[k].tolist()))})
+            k += 1
+    return evs
+
+
+def medir(nombre, fn):
+    t = time.perf_counter(); res = fn()
+    print(f"{nombre:<32} {(time.perf_counter() - t) * 1000:9.1f} ms")
+    return res
+
+
+if __name__ == "__main__":
+    ini = date(2025, 9, 8)
+    fechas = [(ini + timedelta(days=d)).isoformat() for d in range(N_FECHAS)]
+    evs = evaluaciones(N_ALUMNOS, fechas)
+    nueva = evaluaciones(25, [(ini + timedelta(days=N_FECHAS)).isoformat()], id_ini=len(evs) + 1)
+    print(f"{len(evs)} evaluaciones · {N_ALUMNOS} alumnos · {N_FECHAS} fechas · {len(LETRAS)} letras")
+
+    m = MatrizProgreso()
+    medir("carga inicial", lambda: m.actualizar(evs))
+    print(f"{'memoria formato largo':<32} {sum(a.nbytes for a in (m.alumno, m.letra, m.fecha, m.nivel)) / 2**20:9.1f} MiB")
+    medir("actualización (1 día nuevo)", lambda: m.actualizar(nueva))
+    medir("cubo alumno x letra x fecha", m.cubo)
+    medir("medias", m.medias)
+    medir("tendencias", m.tendencias)
+    medir("evolución de un alumno", lambda: m.evolucion_alumno("Alumno 007 (5º)"))
+    medir("media por curso", lambda: m.evolucion_grupos(lambda a: a[a.rfind("(") + 1:-1]))
+    medir("distribución de niveles", m.distribucion)
@@ -0,0 +1,170 @@
+# --- BENCHMARK: LÓGICA DE LA APP CONTRA UN SUPABASE FALSO ---
+# Centro sintético con 1.000 alumnos, 50.000 evaluaciones (50 fechas) y 500 autoevaluaciones
+# en el cliente falso en memoria. Repite el trabajo de cada vista (lecturas, roster, histórico,
+# progreso, PDF, importación) con el mismo perfilado que usa la app y da el tiempo total y el
+# sumado de las llamadas a datos de cada escenario (con lecturas en paralelo puede superar
+# al total). Con --guardar se escribe una línea base en JSON y con --comparar se falla
+# (código 1) si algún escenario es más lento que la base por encima de la tolerancia.
+#   python benchmarks/bench_app.py [--latencia 20] [--guardar base.json] [--comparar base.json]
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import importacion
+from analitica import MatrizProgreso
+from datos import BackendSupabase, Repositorio
+from historial_ae import COLUMNAS as COLUMNAS_AE, HistorialAE, ahora
+from pdf_docente import construir_autoevaluacion, construir_informe
+from perfil import BackendMedido, Perfil
+from roster import ORDEN_CURSOS, Roster
+from supabase_falso import ClienteFalso
+
+N_ALUMNOS, N_FECHAS, N_AUTOS, N_ITEMS, N_ITEMS_AE = 1000, 50, 500, 12, 10
+POR_PAGINA = 50
+TOLERANCIA = 1.25
+
+
+def sembrar(cliente):
+    rnd = random.Random(0)
+    letras = [chr(65 + i) for i in range(N_ITEMS)]
+    cliente.sembrar("configuracion_items", [
+        {"letra": l, "descripcion": f"Criterio {l} de la rúbrica",
+         **{f"nivel_{k}": f"Indicador de nivel {k} del criterio {l}." for k in range(1, 5)}} for l in letras])
+    cliente.sembrar("alumnos", [{"nombre": f"Alumno {a:04d}", "curso": ORDEN_CURSOS[a % len(ORDEN_CURSOS)]}
+                                for a in range(N_ALUMNOS)])
+    ini = date(2025, 9, 8)
+    fechas = [(ini + timedelta(days=7 * d)).isoformat() for d in range(N_FECHAS)]
+    alumnos = cliente.tablas["alumnos"]
+    cliente.sembrar("evaluaciones_alumnos", [
+        {"alumno_id": a["id"], "nombre_alumno": f"{a['nombre']} ({a['curso']})", "fecha": f,
+         "puntos": {l: rnd.randint(1, 4) for l in letras}} for f in fechas for a in alumnos])
+    nombres_ae = [f"Ítem de autoevaluación {k}" for k in range(N_ITEMS_AE)]
+    cliente.sembrar("items_autoevaluacion", [{"nombre": n} for n in nombres_ae])
+    cliente.sembrar("autoevaluaciones", [
+        {"fecha": (ini + timedelta(days=k % 300)).isoformat(), "sda": k % 20 + 1,
+         "items_evaluados": [{"nombre": n, "valor": rnd.choice(["Sí", "No"]), "obs": "Observación " * (k % 4)} for n in nombres_ae],
+         "reflexion_final": {"funciona": "Texto " * 20, "dificultades": "Texto " * 10, "mejoras": "Texto " * 15},
+         "actualizado": ahora()}
+        for k in range(N_AUTOS)])
+    return fechas
+
+
+def escenarios(repo, perfil, fechas):
+    dia = fechas[-1]
+    f_dia = [("gte", "fecha", dia), ("lt", "fecha", (date.fromisoformat(dia) + timedelta(days=1)).isoformat())]
+
+    def cargar_roster():
+        filas = repo.select("alumnos")
+        with perfil.medir("seccion", "ordenar roster"): return Roster(filas)
+
+    def registro():
+        d = repo.lote(roster=cargar_roster, items=lambda: repo.select("configuracion_items", orden="letra"))
+        return len(d["roster"])
+
+    def evaluacion():
+        d = repo.lote(roster=cargar_roster,
+                      evs=lambda: repo.select("evaluaciones_alumnos", "alumno_id, nombre_alumno", [("eq", "fecha", dia)]))
+        hechos = {d["roster"].id_de(e) for e in d["evs"]}
+        return len([i for i in d["roster"].ids() if i not in hechos])
+
+    def historico(pag=1):
+        ini = (pag - 1) * POR_PAGINA
+        d = repo.lote(total=lambda: repo.contar("evaluaciones_alumnos"), roster=cargar_roster,
+                      filas=lambda: repo.select("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, fecha",
+                                                orden="fecha", desc=True, rango=(ini, ini + POR_PAGINA - 1)))
+        with perfil.medir("seccion", "filas histórico"):
+            filas = d["roster"].con_nombres_actuales(d["filas"])
+            for f in filas: f['f_corta'] = f['fecha'][:10]
+        return d["total"]
+
+    def informe_dia():
+        roster = cargar_roster()
+        items = repo.select("configuracion_items", orden="letra")
+        evs = roster.con_nombres_actuales(repo.select("evaluaciones_alumnos", "alumno_id, nombre_alumno, puntos, fecha", f_dia))
+        return len(construir_informe(items, evs, medir=perfil.etapa("pdf")))
+
+    def progreso():
+        roster = cargar_roster()
+        m = MatrizProgreso()
+        for evs in repo.paginas("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, puntos, fecha"):
+            with perfil.medir("seccion", "matriz de progreso"): m.actualizar(roster.con_nombres_actuales(evs))
+        with perfil.medir("seccion", "medias y tendencias"): m.medias(); m.tendencias()
+        return m.n_evaluaciones
+
+    def historial_ae():
+        # Primera página ligera, una página más y el refresco incremental tras guardar
+        h = HistorialAE()
+        for _ in range(2):
+            filtros, n = h.pagina()
+            h.anadir_pagina(repo.select("autoevaluaciones", COLUMNAS_AE, filtros, orden="fecha", desc=True, rango=(0, n - 1)), n)
+        repo.update("autoevaluaciones", {"sda": 1, "actualizado": ahora()}, [("eq", "id", h.ordenadas()[0]["id"])])
+        h.aplicar_cambios(repo.select("autoevaluaciones", COLUMNAS_AE, h.desde()))
+        return len(h.filas)
+
+    def pdf_autoevaluacion():
+        r = repo.select("autoevaluaciones", filtros=[("eq", "id", 1)])[0]
+        return len(construir_autoevaluacion(r, medir=perfil.etapa("pdf")))
+
+    def importar_roster():
+        roster = cargar_roster()
+        csv = importacion.exportar([(a.id, a.nombre, a.curso) for a in roster.alumnos], importacion.COLUMNAS_ALUMNOS)
+        plan = importacion.plan_alumnos(importacion.leer_bloques(io.BytesIO(csv), "alumnos.csv"), roster)
+        return plan.sin_cambios
+
+    return [("registro", registro), ("evaluación", evaluacion), ("histórico pág. 1", historico),
+            ("histórico pág. 500", lambda: historico(500)), ("informe PDF de un día", informe_dia),
+            ("progreso (carga completa)", progreso), ("historial autoevaluación", historial_ae),
+            ("PDF autoevaluación", pdf_autoevaluacion), ("importación roster (simulación)", importar_roster)]
+
+
+def ejecutar(latencia):
+    cliente = ClienteFalso()
+    t = time.perf_counter(); fechas = sembrar(cliente)
+    print(f"{N_ALUMNOS} alumnos · {N_ALUMNOS * N_FECHAS} evaluaciones · {N_AUTOS} autoevaluaciones "
+          f"(sembrado en {time.perf_counter() - t:.1f} s, latencia {latencia} ms)")
+    cliente.latencia = latencia / 1000
+    perfil = Perfil("bench")
+    repo = Repositorio(BackendMedido(BackendSupabase(cliente), perfil))
+    print(f"{'escenario':<34} {'frío ms':>9} {'datos ms':>9} {'caliente ms':>12}")
+    resultados = {}
+    for nombre, fn in escenarios(repo, perfil, fechas):
+        res = []
+        for _ in range(2):  # primer rerun con la caché vacía y segundo con la caché del repositorio
+            perfil.iniciar(nombre); fn()
+            datos = sum(r["ms"] for r in perfil.registros if r["tipo"] == "datos")
+            res.append((perfil.total_ms(), datos))
+        (frio, datos), (caliente, _) = res
+        print(f"{nombre:<34} {frio:9.1f} {datos:9.1f} {caliente:12.1f}")
+        resultados[nombre] = {"frio_ms": round(frio, 1), "datos_ms": round(datos, 1), "caliente_ms": round(caliente, 1)}
+        repo.cache.invalidar("alumnos")  # el siguiente escenario vuelve a leer el roster
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    # Regresión: más lento que la base por encima de la tolerancia (con 5 ms de margen por ruido)
+    lentos = [(n, r["frio_ms"], base[n]["frio_ms"]) for n, r in resultados.items()
+              if n in base and r["frio_ms"] > base[n]["frio_ms"] * tolerancia + 5]
+    for n, ahora, antes in lentos:
+        print(f"REGRESIÓN {n}: {ahora:.1f} ms (base {antes:.1f} ms)")
+    return not lentos
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latencia", type=float, default=0, help="latencia simulada por llamada, en ms")
+    ap.add_argument("--guardar", help="escribe los resultados como línea base JSON")
+    ap.add_argument("--comparar", help="línea base JSON con la que comparar")
+    ap.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = ap.parse_args()
+    resultados = ejecutar(args.latencia)
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f: json.dump(resultados, f, ensure_ascii=False, indent=1)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: base = json.load(f)
+        sys.exit(0 if comparar(resultados, base, args.tolerancia) else 1)
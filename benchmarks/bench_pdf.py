@@ -0,0 +1,55 @@
+# --- BENCHMARK: CONSTRUCCIÓN DE PDF ---
+# Rúbrica de 40 ítems y 500 alumnos. Mide el informe completo con la caché de maquetación
+# vacía (primer informe) y ya caliente (informes siguientes con la misma rúbrica), y por
+# separado el bloque de fichas de alumnos con el tamaño del PDF resultante.
+#   python benchmarks/bench_pdf.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pdf_docente
+from pdf_docente import EvaluacionPDF, a_bytes, construir_informe
+
+N_ITEMS, N_ALUMNOS, REPETICIONES = 40, 500, 3
+
+
+def rubrica(n):
+    return [{"letra": f"{chr(65 + i % 26)}{i // 26 or ''}",
+             "descripcion": f"Descripción del criterio {i} " * (i % 3 + 1),
+             **{f"nivel_{k}": f"Indicador de logro de nivel {k} para el criterio {i}. " * (k + i % 2) for k in range(1, 5)}}
+            for i in range(n)]
+
+
+def evaluaciones(items, n):
+    return [{"nombre_alumno": f"Alumno {a:03d} ({a % 6 + 1}º)", "fecha": "2026-03-01",
+             "puntos": {it["letra"]: (a + j) % 4 + 1 for j, it in enumerate(items[:8])}} for a in range(n)]
+
+
+def solo_fichas(evs):
+    pdf = EvaluacionPDF()
+    pdf.bloque_alumnos(evs)
+    return a_bytes(pdf.output())
+
+
+def medir(fn):
+    t = time.perf_counter(); res = fn()
+    return time.perf_counter() - t, res
+
+
+if __name__ == "__main__":
+    items = rubrica(N_ITEMS)
+    evs = evaluaciones(items, N_ALUMNOS)
+    print(f"Rúbrica: {N_ITEMS} ítems · Alumnos: {N_ALUMNOS}")
+    for _ in range(REPETICIONES):
+        pdf_docente._LINEAS.clear(); pdf_docente._GEOMETRIA.clear()
+        t_frio, pdf = medir(lambda: construir_informe(items, evs))
+        t_solo_tabla_frio, _ = medir(lambda: (pdf_docente._LINEAS.clear(), pdf_docente._GEOMETRIA.clear(), construir_informe(items, [])))
+        t_caliente, _ = medir(lambda: construir_informe(items, evs))
+        t_solo_tabla, _ = medir(lambda: construir_informe(items, []))
+        print(f"informe completo: frío {t_frio * 1000:7.1f} ms · caliente {t_caliente * 1000:7.1f} ms | "
+              f"tabla maestra: fría {t_solo_tabla_frio * 1000:6.1f} ms · caliente {t_solo_tabla * 1000:6.1f} ms | "
+              f"{len(pdf) / 1024:.0f} KiB")
+    for _ in range(REPETICIONES):
+        t_fichas, pdf = medir(lambda: solo_fichas(evs))
+        print(f"fichas de alumnos: {t_fichas * 1000:7.1f} ms | {len(pdf) / 1024:.0f} KiB")
@@ -0,0 +1,170 @@
+# --- CAPA DE ACCESO A DATOS CON CACHÉ ---
+# Envuelve el cliente de Supabase con una caché por tabla (TTL + versión) para que
+# los reruns de Streamlit no vuelvan a pedir a la red lo que ya tenemos.
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool compartido para lanzar a la vez las lecturas independientes de una vista. El cliente
+# de Supabase reutiliza su sesión HTTP (con pool de conexiones) entre hilos.
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="consulta")
+# PostgREST no devuelve más de 1000 filas por respuesta
+LOTE_PAGINA = 1000
+
+
+class BackendSupabase:
+    # Traduce las consultas genéricas del repositorio a llamadas del cliente de Supabase
+    def __init__(self, cliente):
+        self.cliente = cliente
+
+    def _filtrar(self, q, filtros):
+        for op, col, valor in filtros:
+            q = getattr(q, op)(col, valor)
+        return q
+
+    def consultar(self, tabla, columnas="*", filtros=(), orden=None, desc=False, rango=None):
+        q = self._filtrar(self.cliente.table(tabla).select(columnas), filtros)
+        if orden: q = q.order(orden, desc=desc)
+        if rango: q = q.range(*rango)
+        return q.execute().data
+
+    def contar(self, tabla, filtros=()):
+        return self._filtrar(self.cliente.table(tabla).select("id", count="exact", head=True), filtros).execute().count or 0
+
+    def insertar(self, tabla, filas):
+        return self.cliente.table(tabla).insert(filas).execute().data
+
+    def actualizar(self, tabla, datos, filtros):
+        return self._filtrar(self.cliente.table(tabla).update(datos), filtros).execute().data
+
+    def upsert(self, tabla, filas):
+        return self.cliente.table(tabla).upsert(filas).execute().data
+
+    def borrar(self, tabla, filtros):
+        return self._filtrar(self.cliente.table(tabla).delete(), filtros).execute().data
+
+
+class CacheTablas:
+    # Entradas indexadas por (tabla, consulta). Cada tabla lleva un número de versión:
+    # al escribir se incrementa y todas sus entradas quedan obsoletas de golpe.
+    def __init__(self, ttl=300, max_entradas=64):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+        self.versiones = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.lock = threading.RLock()
+
+    def obtener(self, tabla, clave):
+        with self.lock:
+            return self._obtener(tabla, clave)
+
+    def _obtener(self, tabla, clave):
+        ent = self.entradas.get((tabla, clave))
+        if ent is not None:
+            version, instante, datos = ent
+            if version == self.versiones.get(tabla, 0) and time.monotonic() - instante < self.ttl:
+                self.entradas.move_to_end((tabla, clave))
+                self.aciertos += 1
+                return datos
+            del self.entradas[(tabla, clave)]
+        self.fallos += 1
+        return None
+
+    def guardar(self, tabla, clave, datos, version=None):
+        with self.lock:
+            # Si la tabla cambió mientras se consultaba, el resultado ya no vale
+            if version is not None and version != self.versiones.get(tabla, 0): return
+            self._guardar(tabla, clave, datos)
+
+    def _guardar(self, tabla, clave, datos):
+        self.entradas[(tabla, clave)] = (self.versiones.get(tabla, 0), time.monotonic(), datos)
+        self.entradas.move_to_end((tabla, clave))
+        # Expulsamos las menos usadas recientemente
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+
+    def version(self, tabla):
+        return self.versiones.get(tabla, 0)
+
+    def invalidar(self, tabla):
+        with self.lock:
+            self.versiones[tabla] = self.versiones.get(tabla, 0) + 1
+            for k in [k for k in self.entradas if k[0] == tabla]:
+                del self.entradas[k]
+
+    def stats(self):
+        return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self.entradas),
+                "versiones": dict(self.versiones)}
+
+
+def _normalizar(filtros):
+    # Filtros hashables para usarlos como clave ("in_" recibe listas)
+    return tuple((op, col, tuple(v) if isinstance(v, (list, set)) else v) for op, col, v in filtros)
+
+
+class Repositorio:
+    # Lecturas cacheadas y escrituras que invalidan la tabla afectada (write-through)
+    def __init__(self, backend, ttl=300, max_entradas=64, al_escribir=None):
+        self.backend = backend
+        self.cache = CacheTablas(ttl, max_entradas)
+        self.al_escribir = al_escribir
+
+    def _escrito(self, tabla):
+        self.cache.invalidar(tabla)
+        if self.al_escribir: self.al_escribir()
+
+    def select(self, tabla, columnas="*", filtros=(), orden=None, desc=False, rango=None):
+        filtros = _normalizar(filtros)
+        clave = (columnas, filtros, orden, desc, tuple(rango) if rango else None)
+        datos = self.cache.obtener(tabla, clave)
+        if datos is None:
+            version = self.cache.version(tabla)
+            datos = self.backend.consultar(tabla, columnas, filtros, orden, desc, rango)
+            self.cache.guardar(tabla, clave, datos, version)
+        # Copias superficiales: la app modifica los dicts que recibe
+        return [dict(f) for f in datos]
+
+    def contar(self, tabla, filtros=()):
+        filtros = _normalizar(filtros)
+        n = self.cache.obtener(tabla, ("#contar", filtros))
+        if n is None:
+            version = self.cache.version(tabla)
+            n = self.backend.contar(tabla, filtros)
+            self.cache.guardar(tabla, ("#contar", filtros), n, version)
+        return n
+
+    def paginas(self, tabla, columnas="*", filtros=(), lote=LOTE_PAGINA):
+        # Recorre una lectura que puede pasar de LOTE_PAGINA filas en páginas ordenadas por id:
+        # cada una empieza tras el último id de la anterior ('columnas' tiene que incluir id)
+        ultimo = None
+        while True:
+            desde = [("gt", "id", ultimo)] if ultimo is not None else []
+            pagina = self.select(tabla, columnas, [*filtros, *desde], orden="id", rango=(0, lote - 1))
+            if pagina: yield pagina
+            if len(pagina) < lote: return
+            ultimo = pagina[-1]["id"]
+
+    def lote(self, **consultas):
+        # Ejecuta a la vez lecturas independientes (funciones sin argumentos) y devuelve
+        # {nombre: resultado}: la espera es la de la consulta más lenta, no la suma.
+        futuros = {k: _POOL.submit(fn) for k, fn in consultas.items()}
+        return {k: f.result() for k, f in futuros.items()}
+
+    def insert(self, tabla, filas):
+        try: return self.backend.insertar(tabla, filas)
+        finally: self._escrito(tabla)
+
+    def update(self, tabla, datos, filtros):
+        try: return self.backend.actualizar(tabla, datos, tuple(filtros))
+        finally: self._escrito(tabla)
+
+    def upsert(self, tabla, filas):
+        try: return self.backend.upsert(tabla, filas)
+        finally: self._escrito(tabla)
+
+    def delete(self, tabla, filtros):
+        try: return self.backend.borrar(tabla, tuple(filtros))
+        finally: self._escrito(tabla)
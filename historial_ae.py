@@ -0,0 +1,62 @@
+# --- HISTORIAL DE AUTOEVALUACIONES ---
+# Lista ligera (id, fecha, sda) paginada por clave sobre 'fecha' y refrescada de forma
+# incremental: solo se piden las filas con 'actualizado' desde la última marca vista.
+# El detalle (ítems y reflexión) se pide aparte, al editar o imprimir.
+from datetime import datetime, timezone
+
+COLUMNAS = "id, fecha, sda, actualizado"
+
+
+def ahora():
+    # Valor de 'actualizado' para las escrituras (en Supabase lo fija también el trigger)
+    return datetime.now(timezone.utc).isoformat()
+
+
+class HistorialAE:
+    def __init__(self, por_pagina=20):
+        self.por_pagina = por_pagina
+        self.filas = {}          # id -> {id, fecha, sda, actualizado}
+        self.fin = False         # ya no quedan páginas por cargar
+        self.marca = None        # mayor 'actualizado' visto
+
+    def _frontera(self):
+        # Fecha más antigua cargada e ids ya mostrados de esa fecha
+        if not self.filas: return None, set()
+        f_min = min(f['fecha'] for f in self.filas.values())
+        return f_min, {f['id'] for f in self.filas.values() if f['fecha'] == f_min}
+
+    def pagina(self):
+        # (filtros, límite) de la siguiente página por fecha descendente: desde la fecha más
+        # antigua cargada (incluida, puede haber más ese día) y con hueco para las ya vistas
+        f_min, vistos = self._frontera()
+        return ([("lte", "fecha", f_min)] if f_min else []), self.por_pagina + len(vistos)
+
+    def anadir_pagina(self, filas, limite):
+        _, vistos = self._frontera()
+        if len(filas) < limite: self.fin = True
+        for f in filas:
+            if f['id'] not in vistos: self.filas[f['id']] = f
+        self._marcar(filas)
+
+    def desde(self):
+        # Filtro de cambios desde la última marca (incluida: varias filas pueden compartirla).
+        # Sin marca (tabla vacía al cargar) se pide todo, que entonces es poco
+        return [("gte", "actualizado", self.marca)] if self.marca else []
+
+    def aplicar_cambios(self, filas):
+        # Altas y cambios dentro del tramo cargado; lo que cae más atrás llegará al paginar
+        f_min, _ = self._frontera()
+        for f in filas:
+            if self.fin or f_min is None or f['fecha'] >= f_min: self.filas[f['id']] = f
+            else: self.filas.pop(f['id'], None)
+        self._marcar(filas)
+
+    def _marcar(self, filas):
+        marcas = [f['actualizado'] for f in filas if f.get('actualizado')]
+        if marcas: self.marca = max([self.marca, *marcas] if self.marca else marcas)
+
+    def quitar(self, id_):
+        self.filas.pop(id_, None)
+
+    def ordenadas(self):
+        return sorted(self.filas.values(), key=lambda f: (f['fecha'], f['id']), reverse=True)
@@ -0,0 +1,154 @@
+# --- IMPORTACIÓN / EXPORTACIÓN MASIVA (CSV y XLSX) ---
+# Lee el archivo por bloques, valida cada fila, calcula la diferencia con lo que ya hay
+# (altas, cambios, bajas) y la aplica con upserts/borrados por lotes. El plan se puede
+# revisar antes de aplicarlo (simulación).
+import csv
+import io
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from roster import ORDEN_CURSOS
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+TAM_BLOQUE = 500
+TAM_LOTE = 200
+COLUMNAS_ALUMNOS = ["id", "nombre", "curso"]
+COLUMNAS_ITEMS = ["letra", "descripcion", "nivel_1", "nivel_2", "nivel_3", "nivel_4"]
+
+
+@dataclass
+class Plan:
+    tabla: str
+    altas: list = field(default_factory=list)
+    cambios: list = field(default_factory=list)
+    bajas: list = field(default_factory=list)      # claves a borrar
+    errores: list = field(default_factory=list)    # (fila del archivo, mensaje)
+    sin_cambios: int = 0
+
+    @property
+    def valido(self):
+        return not self.errores
+
+
+# --- Lectura por bloques ---
+def leer_bloques(archivo, nombre, tam=TAM_BLOQUE):
+    # Devuelve DataFrames de texto de como mucho 'tam' filas con columnas en minúsculas
+    if nombre.lower().endswith((".xlsx", ".xlsm")):
+        if openpyxl is None: raise RuntimeError("Para importar XLSX hace falta instalar openpyxl")
+        libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+        filas = libro.active.iter_rows(values_only=True)
+        cabecera = [str(c or "").strip().lower() for c in next(filas, [])]
+        bloque = []
+        for f in filas:
+            bloque.append(["" if v is None else str(v).strip() for v in f])
+            if len(bloque) == tam:
+                yield pd.DataFrame(bloque, columns=cabecera); bloque = []
+        if bloque: yield pd.DataFrame(bloque, columns=cabecera)
+        libro.close()
+        return
+    for bloque in pd.read_csv(archivo, chunksize=tam, dtype=str, keep_default_na=False,
+                              sep=None, engine="python", encoding="utf-8-sig"):
+        bloque.columns = [c.strip().lower() for c in bloque.columns]
+        yield bloque.apply(lambda s: s.str.strip())
+
+
+def _faltan(bloque, obligatorias):
+    return [c for c in obligatorias if c not in bloque.columns]
+
+
+# --- Alumnos ---
+def plan_alumnos(bloques, roster, borrar_ausentes=False):
+    plan = Plan("alumnos")
+    vistos, resueltos, filas_cambio, n_fila = set(), set(), {}, 1
+    for bloque in bloques:
+        if faltan := _faltan(bloque, ["nombre", "curso"]):
+            plan.errores.append((0, f"Faltan columnas: {', '.join(faltan)}")); return plan
+        for f in bloque.to_dict("records"):
+            n_fila += 1
+            nombre, curso, id_txt = f["nombre"], f["curso"], f.get("id", "")
+            if not nombre: plan.errores.append((n_fila, "Nombre vacío")); continue
+            if curso not in ORDEN_CURSOS:
+                plan.errores.append((n_fila, f"Curso desconocido: {curso!r}")); continue
+            if (nombre, curso) in vistos:
+                plan.errores.append((n_fila, f"Alumno repetido: {nombre} ({curso})")); continue
+            vistos.add((nombre, curso))
+            if id_txt:
+                if not id_txt.isdigit() or int(id_txt) not in roster.por_id:
+                    plan.errores.append((n_fila, f"Id desconocido: {id_txt}")); continue
+                actual = roster.por_id[int(id_txt)]
+            else:
+                actual = roster.por_etiqueta.get(f"{nombre} ({curso})")
+            if actual is None:
+                plan.altas.append({"nombre": nombre, "curso": curso}); continue
+            resueltos.add(actual.id)
+            if (actual.nombre, actual.curso) != (nombre, curso):
+                plan.cambios.append({"id": actual.id, "nombre": nombre, "curso": curso})
+                filas_cambio[actual.id] = n_fila
+            else:
+                plan.sin_cambios += 1
+    # Un cambio no puede dejar a dos alumnos con el mismo nombre y curso: se compara con cómo
+    # quedaría cada alumno existente después de aplicar el archivo
+    final = {a.id: a.etiqueta for a in roster.alumnos}
+    final.update({c["id"]: f"{c['nombre']} ({c['curso']})" for c in plan.cambios})
+    duenos = {}
+    for i, etiqueta in final.items(): duenos.setdefault(etiqueta, []).append(i)
+    for c in plan.cambios:
+        otros = [i for i in duenos[f"{c['nombre']} ({c['curso']})"] if i != c["id"]]
+        if otros:
+            plan.errores.append((filas_cambio[c["id"]], f"{c['nombre']} ({c['curso']}) ya es el alumno {otros[0]}"))
+    if borrar_ausentes:
+        plan.bajas = [a.id for a in roster.alumnos if a.id not in resueltos]
+    return plan
+
+
+# --- Ítems de la rúbrica ---
+def plan_items(bloques, items, borrar_ausentes=False):
+    plan = Plan("configuracion_items")
+    actuales = {it["letra"]: it for it in items}
+    vistas, n_fila = set(), 1
+    for bloque in bloques:
+        if faltan := _faltan(bloque, ["letra", "descripcion"]):
+            plan.errores.append((0, f"Faltan columnas: {', '.join(faltan)}")); return plan
+        for f in bloque.to_dict("records"):
+            n_fila += 1
+            letra = f["letra"].upper()
+            if not letra: plan.errores.append((n_fila, "Letra vacía")); continue
+            if letra in vistas: plan.errores.append((n_fila, f"Letra repetida: {letra}")); continue
+            vistas.add(letra)
+            fila = {"letra": letra, **{c: f.get(c, "") for c in COLUMNAS_ITEMS[1:]}}
+            previa = actuales.get(letra)
+            if previa is None: plan.altas.append(fila)
+            elif any(str(previa.get(c) or "") != fila[c] for c in COLUMNAS_ITEMS[1:]): plan.cambios.append(fila)
+            else: plan.sin_cambios += 1
+    if borrar_ausentes:
+        plan.bajas = [l for l in actuales if l not in vistas]
+    return plan
+
+
+# --- Aplicación por lotes ---
+def aplicar(repo, plan, tam=TAM_LOTE):
+    if not plan.valido: raise ValueError("El plan tiene errores; corrígelos antes de aplicar")
+    clave = "id" if plan.tabla == "alumnos" else "letra"
+    for k in range(0, len(plan.altas), tam):
+        repo.insert(plan.tabla, plan.altas[k:k + tam])
+    for k in range(0, len(plan.cambios), tam):
+        repo.upsert(plan.tabla, plan.cambios[k:k + tam])
+    for k in range(0, len(plan.bajas), tam):
+        repo.delete(plan.tabla, [("in_", clave, plan.bajas[k:k + tam])])
+
+
+# --- Exportación ---
+def exportar(filas, columnas, formato="csv"):
+    df = pd.DataFrame(filas, columns=columnas)
+    if formato == "xlsx":
+        if openpyxl is None: raise RuntimeError("Para exportar XLSX hace falta instalar openpyxl")
+        buf = io.BytesIO()
+        df.to_excel(buf, index=False, engine="openpyxl")
+        return buf.getvalue()
+    # utf-8 con BOM para que Excel respete tildes y 'º'
+    return df.to_csv(index=False, quoting=csv.QUOTE_MINIMAL).encode("utf-8-sig")
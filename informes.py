@@ -0,0 +1,167 @@
+# --- COLA DE GENERACIÓN DE PDF EN SEGUNDO PLANO ---
+# Los PDF se construyen en un pool de hilos fuera del script de Streamlit. El resultado
+# se guarda en una caché indexada por el hash del contenido (ítems + evaluaciones + filtro),
+# así que volver a pedir el mismo informe es inmediato.
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+import types
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from pdf_docente import construir_autoevaluacion, construir_informe
+
+
+def clave_contenido(*partes):
+    datos = json.dumps(partes, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(datos.encode("utf-8")).hexdigest()
+
+
+class ColaPDF:
+    def __init__(self, max_hilos=2, max_bytes=50 * 1024 * 1024):
+        self.pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="pdf")
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.bytes_cache = 0
+        self.trabajos = {}
+        self.lock = threading.Lock()
+
+    def enviar(self, clave, construir, *args, **opciones):
+        # construir(*args, progreso=callback, **opciones) -> bytes
+        with self.lock:
+            if clave in self.cache or clave in self.trabajos:
+                return clave
+            trabajo = {"progreso": 0.0, "error": None}
+            self.trabajos[clave] = trabajo
+
+        def progreso(fraccion):
+            trabajo["progreso"] = fraccion
+
+        def ejecutar():
+            try:
+                pdf = construir(*args, progreso=progreso, **opciones)
+            except Exception as e:
+                trabajo["error"] = str(e)
+                return
+            with self.lock:
+                self._guardar(clave, pdf)
+                del self.trabajos[clave]
+
+        self.pool.submit(ejecutar)
+        return clave
+
+    def _guardar(self, clave, pdf):
+        self.cache[clave] = pdf
+        self.bytes_cache += len(pdf)
+        # Expulsión por tamaño, empezando por el menos usado
+        while self.bytes_cache > self.max_bytes and len(self.cache) > 1:
+            _, viejo = self.cache.popitem(last=False)
+            self.bytes_cache -= len(viejo)
+
+    def en_curso(self, clave):
+        # Fracción hecha si el trabajo sigue en marcha; None si terminó, falló o no existe.
+        # A diferencia de estado(), no descarta el error
+        with self.lock:
+            trabajo = self.trabajos.get(clave)
+            return trabajo["progreso"] if trabajo is not None and trabajo["error"] is None else None
+
+    def estado(self, clave):
+        # ("hecho", bytes) | ("en_curso", fracción) | ("error", mensaje) | (None, None)
+        with self.lock:
+            if clave in self.cache:
+                self.cache.move_to_end(clave)
+                return "hecho", self.cache[clave]
+            trabajo = self.trabajos.get(clave)
+            if trabajo is None:
+                return None, None
+            if trabajo["error"] is not None:
+                # Se descarta el trabajo fallido para poder reintentarlo
+                del self.trabajos[clave]
+                return "error", trabajo["error"]
+            return "en_curso", trabajo["progreso"]
+
+
+# --- EXPORTACIÓN MASIVA EN ZIP ---
+# Un informe por alumno y uno por autoevaluación, repartidos entre procesos. Las evaluaciones
+# se piden alumno a alumno según se lanzan los trabajos y cada PDF se escribe en el ZIP según
+# termina y se suelta, así la memoria no crece con la clase.
+# Los procesos no se crean con fork: el script de Streamlit tiene hilos (pool de consultas,
+# cola de PDF, sincronización) y un fork puede heredar un lock cogido por alguno de ellos.
+_BASE = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+class _Proceso(_BASE.Process):
+    # Streamlit instala el script como módulo __main__ y un proceso forkserver/spawn lo volvería
+    # a ejecutar entero al arrancar (conexión, hilos, vistas). Mientras se prepara el proceso,
+    # __main__ es un módulo vacío: el hijo solo importa lo que necesita la tarea
+    @staticmethod
+    def _Popen(proceso):
+        script = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            return _BASE.Process._Popen(proceso)
+        finally:
+            sys.modules["__main__"] = script
+
+
+class _Contexto(type(_BASE)):
+    Process = _Proceso
+
+
+_CONTEXTO = _Contexto()
+def _archivo(texto):
+    return re.sub(r"[^\w\-. ]+", "_", str(texto)).strip() or "sin_nombre"
+
+
+def _pdf_alumno(nombre, items, evaluaciones):
+    return f"alumnos/{_archivo(nombre)}.pdf", construir_informe(items, evaluaciones)
+
+
+def _pdf_autoevaluacion(registro):
+    return f"autoevaluaciones/SDA{registro['sda']}_{_archivo(registro['fecha'])}_{registro['id']}.pdf", construir_autoevaluacion(registro)
+
+
+def exportar_zip(items, alumnos, evaluaciones_de, autoevaluaciones, n_autoevaluaciones=None,
+                 max_procesos=None, progreso=None, max_memoria=16 * 1024 * 1024):
+    # alumnos: pares (id, nombre). evaluaciones_de(id) devuelve las evaluaciones de un alumno y
+    # evaluaciones_de(None) las que no son de ningún alumno actual (se agrupan por el nombre
+    # guardado). autoevaluaciones puede ser un iterable perezoso si se da n_autoevaluaciones
+    sueltas = {}
+    for e in evaluaciones_de(None):
+        sueltas.setdefault(str(e.get('nombre_alumno', 'Sin Nombre')), []).append(e)
+    if n_autoevaluaciones is None: n_autoevaluaciones = len(autoevaluaciones)
+    total = len(alumnos) + len(sueltas) + n_autoevaluaciones
+
+    def tareas():
+        for i, nombre in alumnos:
+            yield _pdf_alumno, (f"{nombre}_{i}", items, evaluaciones_de(i))
+        for nombre, evs in sueltas.items():
+            yield _pdf_alumno, (nombre, items, evs)
+        for r in autoevaluaciones:
+            yield _pdf_autoevaluacion, (r,)
+
+    salida = tempfile.SpooledTemporaryFile(max_size=max_memoria)
+    max_procesos = max_procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_procesos, mp_context=_CONTEXTO) as pool, \
+            zipfile.ZipFile(salida, "w", zipfile.ZIP_DEFLATED) as zf:
+        siguientes, pendientes, hechos = tareas(), set(), 0
+        while True:
+            # Ventana acotada de trabajos en vuelo
+            while len(pendientes) < 2 * max_procesos and (tarea := next(siguientes, None)):
+                fn, args = tarea
+                pendientes.add(pool.submit(fn, *args))
+            if not pendientes: break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for f in listos:
+                archivo, pdf = f.result()
+                zf.writestr(archivo, pdf)
+                hechos += 1
+            if progreso: progreso(min(hechos / total, 1.0))
+    salida.seek(0)
+    return salida
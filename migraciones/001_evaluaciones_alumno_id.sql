@@ -0,0 +1,20 @@
+-- Enlaza evaluaciones_alumnos con alumnos por id en lugar de por el texto "Nombre (Curso)".
+-- Ejecutar una vez en el editor SQL de Supabase. Es idempotente.
+
+alter table evaluaciones_alumnos
+    add column if not exists alumno_id bigint references alumnos (id) on delete set null;
+
+create index if not exists ix_evaluaciones_alumno_fecha
+    on evaluaciones_alumnos (alumno_id, fecha);
+
+-- Filas existentes: se resuelven por el nombre guardado. Si hay dos alumnos con el mismo
+-- nombre y curso la fila se deja sin enlazar (alumno_id nulo) para revisarla a mano.
+update evaluaciones_alumnos e
+set alumno_id = a.id
+from alumnos a
+where e.alumno_id is null
+  and e.nombre_alumno = a.nombre || ' (' || a.curso || ')'
+  and (select count(*) from alumnos b where b.nombre = a.nombre and b.curso = a.curso) = 1;
+
+-- Filas que no se han podido enlazar
+select id, nombre_alumno, fecha from evaluaciones_alumnos where alumno_id is null order by fecha;
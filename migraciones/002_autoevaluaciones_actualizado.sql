@@ -0,0 +1,22 @@
+-- Marca de última modificación en autoevaluaciones para que el historial se refresque
+-- pidiendo solo las filas cambiadas. Ejecutar una vez en el editor SQL de Supabase. Es idempotente.
+
+-- Las filas existentes reciben la hora de la migración
+alter table autoevaluaciones
+    add column if not exists actualizado timestamptz not null default now();
+
+create index if not exists ix_autoevaluaciones_fecha on autoevaluaciones (fecha desc, id desc);
+create index if not exists ix_autoevaluaciones_actualizado on autoevaluaciones (actualizado);
+
+-- La hora la pone siempre el servidor, aunque el cliente envíe otra
+create or replace function marcar_actualizado() returns trigger as $$
+begin
+    new.actualizado := now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists tr_autoevaluaciones_actualizado on autoevaluaciones;
+create trigger tr_autoevaluaciones_actualizado
+    before insert or update on autoevaluaciones
+    for each row execute function marcar_actualizado();
@@ -0,0 +1,5 @@
+-- Índice por fecha en evaluaciones_alumnos: lo usan las consultas de un día (alumnos ya
+-- evaluados, día abierto del Histórico) y los rangos del Histórico, que filtran y ordenan
+-- por fecha sin alumno_id. Ejecutar una vez en el editor SQL de Supabase. Es idempotente.
+
+create index if not exists ix_evaluaciones_fecha on evaluaciones_alumnos (fecha);
@@ -0,0 +1,315 @@
+# --- CLASES PDF CORREGIDAS ---
+from collections import OrderedDict
+
+from fpdf import FPDF
+
+from perfil import etapa
+
+# --- CACHÉ DE MAQUETACIÓN ---
+# El corte en líneas de un texto solo depende de la fuente, el tamaño y el ancho, y las
+# descripciones de la rúbrica se repiten en todos los informes: se mide una sola vez.
+_LINEAS = OrderedDict()
+_MAX_LINEAS = 20000
+# Geometría de la tabla maestra por versión de rúbrica: [(lineas por columna, alto de fila)]
+_GEOMETRIA = OrderedDict()
+_MAX_GEOMETRIAS = 8
+W_MAESTRA = [10, 35, 36.25, 36.25, 36.25, 36.25]
+
+
+def lineas(pdf, w, texto):
+    clave = (pdf.font_family, pdf.font_style, pdf.font_size_pt, pdf.c_margin, w, texto)
+    res = _LINEAS.get(clave)
+    if res is None:
+        res = _LINEAS[clave] = tuple(pdf.multi_cell(w, 4, texto, split_only=True))
+        if len(_LINEAS) > _MAX_LINEAS: _LINEAS.popitem(last=False)
+    return res
+
+
+def pintar_lineas(pdf, x, y, w, h, lns):
+    # Equivale a multi_cell(w, h, texto, 0, 'L') con las líneas ya cortadas
+    for k, ln_txt in enumerate(lns):
+        pdf.set_xy(x, y + k * h)
+        pdf.cell(w, h, ln_txt, 0, 0, 'L')
+
+
+def nivel_valido(nivel):
+    # Verificamos que el nivel sea válido antes de comparar
+    return int(nivel) if nivel is not None and str(nivel).isdigit() else None
+
+
+class PlantillaFicha:
+    # Parte fija de la ficha de un alumno para una lista de letras: etiquetas de letra y
+    # de nivel y el marco. Se calcula una vez y en cada alumno solo se añaden las marcas.
+    H_FILA, W_LETRA, W_NIVEL = 6, 8, 13
+
+    def __init__(self, pdf, letras, w_col=60):
+        pdf.set_font("Arial", "", 8)
+        base = self.H_FILA / 2 + 0.3 * pdf.font_size
+        w_num = {n: pdf.get_string_width(str(n)) for n in range(1, 5)}
+        self.n_filas = len(letras)
+        self.alto = self.n_filas * self.H_FILA
+        self.w_col = w_col
+        self.etiquetas = []
+        for k, letra in enumerate(letras):
+            dy = k * self.H_FILA + base
+            self.etiquetas.append((pdf.c_margin, dy, f"{letra}:"))
+            for n in range(1, 5):
+                dx = self.W_LETRA + (n - 1) * self.W_NIVEL + (self.W_NIVEL - w_num[n]) / 2
+                self.etiquetas.append((dx, dy, str(n)))
+
+    def pintar(self, pdf, x, y, niveles):
+        # Mismo resultado que dibujar cada fila con cell(): marcas, etiquetas y bordes laterales
+        pdf.set_fill_color(200, 200, 200)
+        for k, nivel in enumerate(niveles):
+            n = nivel_valido(nivel)
+            if n in (1, 2, 3, 4):
+                pdf.ellipse(x + self.W_LETRA + (n - 1) * self.W_NIVEL + 4.5, y + k * self.H_FILA + 1, 4, 4, 'F')
+        pdf.set_font("Arial", "", 8)
+        for dx, dy, texto in self.etiquetas:
+            pdf.text(x + dx, y + dy, texto)
+        if self.n_filas:
+            pdf.line(x, y, x, y + self.alto)
+            pdf.line(x + self.w_col + 0.1, y, x + self.w_col + 0.1, y + self.alto)
+        return y + self.alto
+
+
+_PLANTILLAS = OrderedDict()
+
+
+def plantilla_ficha(pdf, letras):
+    p = _PLANTILLAS.get(letras)
+    if p is None:
+        p = _PLANTILLAS[letras] = PlantillaFicha(pdf, letras)
+        if len(_PLANTILLAS) > 64: _PLANTILLAS.popitem(last=False)
+    return p
+
+
+def geometria_maestra(pdf, items):
+    textos = tuple((str(it.get('letra', '')), str(it.get('descripcion', '')),
+                    str(it.get('nivel_1') or ""), str(it.get('nivel_2') or ""),
+                    str(it.get('nivel_3') or ""), str(it.get('nivel_4') or "")) for it in items)
+    clave = (pdf.font_family, pdf.font_style, pdf.font_size_pt, textos)
+    geo = _GEOMETRIA.get(clave)
+    if geo is None:
+        geo = []
+        for fila in textos:
+            cols = [lineas(pdf, W_MAESTRA[i], t) for i, t in enumerate(fila)]
+            geo.append((cols, max(len(c) for c in cols) * 4 + 2))
+        _GEOMETRIA[clave] = geo
+        if len(_GEOMETRIA) > _MAX_GEOMETRIAS: _GEOMETRIA.popitem(last=False)
+    else:
+        _GEOMETRIA.move_to_end(clave)
+    return geo
+
+class EvaluacionPDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        self.set_auto_page_break(auto=True, margin=15)
+        self.alias_nb_pages()
+
+    def header(self):
+        self.set_font("Arial", "B", 14)
+        self.cell(0, 10, "INFORME DE EVALUACIÓN DOCENTE", ln=True, align="C")
+        self.set_font("Arial", "I", 10)
+        self.set_text_color(255, 110, 64) 
+        self.cell(0, 5, "Especialista: Ángela Ortiz Ordóñez", ln=True, align="C")
+        self.set_text_color(0, 0, 0)
+        self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 10, f"Página {self.page_no()}/{{nb}}", align="C")
+
+    def tabla_maestra(self, items, progreso=None):
+        if not items:
+            self.add_page()
+            self.cell(0, 10, "No hay ítems configurados.")
+            return
+        self.add_page()
+        self.set_font("Arial", "B", 8)
+        self.set_fill_color(230, 230, 230)
+        w = W_MAESTRA
+        headers = ["L.", "Descripción", "Nivel 1", "Nivel 2", "Nivel 3", "Nivel 4"]
+        for i, h in enumerate(headers): self.cell(w[i], 8, h, 1, 0, "C", True)
+        self.ln()
+        self.set_font("Arial", "", 7)
+        for cols, h_fila in geometria_maestra(self, items):
+            if self.get_y() + h_fila > 270: self.add_page()
+            x_ini, y_ini = self.get_x(), self.get_y()
+            for i, lns in enumerate(cols):
+                style = 'FD' if i < 2 else 'D'
+                if i < 2: self.set_fill_color(245, 245, 245)
+                self.rect(x_ini, y_ini, w[i], h_fila, style=style)
+                pintar_lineas(self, x_ini, y_ini, w[i], 4, lns)
+                x_ini += w[i]
+            self.set_xy(10, y_ini + h_fila)
+            if progreso: progreso()
+
+    def bloque_alumnos(self, evaluaciones, progreso=None):
+        if not evaluaciones: return
+        self.add_page()
+        self.set_font("Arial", "B", 10)
+        self.set_fill_color(240, 240, 240)
+        self.cell(190, 8, "EVALUACIÓN ALUMNADO", 1, 1, "C", True)
+        self.ln(5)
+        
+        w_col, gap = 60, 5
+        # Iteramos de 3 en 3 para las filas de alumnos
+        for i in range(0, len(evaluaciones), 3):
+            y_inicio_fila = self.get_y()
+            # Si no cabe el bloque del alumno (aprox 60mm), nueva página
+            if y_inicio_fila > 220: 
+                self.add_page()
+                y_inicio_fila = self.get_y()
+            
+            max_y_alcanzado = y_inicio_fila
+            
+            for j in range(3):
+                idx = i + j
+                if idx < len(evaluaciones):
+                    e = evaluaciones[idx]
+                    x_pos = 10 + (j * (w_col + gap))
+                    self.set_xy(x_pos, y_inicio_fila)
+                    
+                    # Nombre del Alumno
+                    self.set_font("Arial", "B", 8)
+                    self.set_fill_color(240, 240, 240)
+                    nombre = str(e.get('nombre_alumno', 'Sin Nombre'))[:30]
+                    self.cell(w_col, 7, f" {nombre}", 1, 1, "L", True)
+                    
+                    # Items de puntuación
+                    y_item = self.get_y()
+                    puntos = e.get('puntos', {})
+                    if not isinstance(puntos, dict): puntos = {}
+                    plantilla = plantilla_ficha(self, tuple(puntos))
+                    if y_item + plantilla.alto <= self.page_break_trigger:
+                        y_item = plantilla.pintar(self, x_pos, y_item, puntos.values())
+                    else:
+                        # Ficha más larga que la página: dibujo celda a celda con salto automático
+                        y_item = self.ficha_por_celdas(x_pos, y_item, puntos)
+                    
+                    self.line(x_pos, y_item, x_pos + w_col, y_item)
+                    max_y_alcanzado = max(max_y_alcanzado, y_item)
+            
+            self.set_y(max_y_alcanzado + 5)
+            if progreso: progreso(min(3, len(evaluaciones) - i))
+
+    def ficha_por_celdas(self, x_pos, y_item, puntos):
+        for letra, nivel in puntos.items():
+            self.set_xy(x_pos, y_item)
+            self.set_font("Arial", "", 8)
+            self.cell(8, 6, f"{letra}:", "L", 0)
+            
+            # Dibujar círculos de niveles
+            for n in range(1, 5):
+                if nivel_valido(nivel) == n:
+                    self.set_fill_color(200, 200, 200)
+                    self.ellipse(self.get_x() + 4.5, self.get_y() + 1, 4, 4, 'F')
+                self.cell(13, 6, str(n), 0, 0, "C")
+            
+            self.cell(0.1, 6, "", "R", 1)
+            y_item += 6
+        return y_item
+
+
+class AutoevaluacionPDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        self.set_auto_page_break(auto=True, margin=15)
+        self.alias_nb_pages()
+
+    def header(self):
+        self.set_font("Arial", "B", 14)
+        self.cell(0, 10, "AUTOEVALUACIÓN DE LA PRÁCTICA DOCENTE", ln=True, align="C")
+        self.set_font("Arial", "I", 10)
+        self.set_text_color(255, 110, 64)
+        self.cell(0, 5, "Especialista: Ángela Ortiz Ordóñez", ln=True, align="C")
+        self.set_text_color(0, 0, 0)
+        self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 10, f"Página {self.page_no()}/{{nb}}", align="C")
+
+    def tabla_items(self, sda_num, fecha, datos_items):
+        self.add_page()
+        self.set_font("Arial", "B", 10)
+        self.set_fill_color(240, 240, 240)
+        self.cell(95, 10, f" SDA: {sda_num}", 1, 0, "L", True)
+        self.cell(95, 10, f" Fecha: {fecha}", 1, 1, "R", True)
+        self.ln()
+        w = [80, 15, 15, 80]
+        self.set_font("Arial", "B", 9)
+        headers = ["Ítem", "Sí", "No", "Observaciones"]
+        for i, h in enumerate(headers): self.cell(w[i], 8, h, 1, 0, "C", True)
+        self.ln()
+        self.set_font("Arial", "", 8)
+        for item in datos_items:
+            obs_txt = str(item.get('obs') or "")
+            nom_txt = str(item.get('nombre') or "")
+            l_obs = lineas(self, w[3], obs_txt)
+            l_nom = lineas(self, w[0], nom_txt)
+            h_fila = max(len(l_obs), len(l_nom)) * 4.5
+            h_fila = max(h_fila, 8)
+            if self.get_y() + h_fila > 260: self.add_page()
+            x, y = self.get_x(), self.get_y()
+            self.rect(x, y, w[0], h_fila)
+            pintar_lineas(self, x, y, w[0], 4.5, l_nom)
+            self.set_xy(x + w[0], y)
+            self.rect(x + w[0], y, w[1], h_fila)
+            if item['valor'] == "Sí":
+                self.set_font("ZapfDingbats", "", 10)
+                self.cell(w[1], h_fila, "4", 0, 0, "C")
+            self.set_xy(x + w[0] + w[1], y)
+            self.rect(x + w[0] + w[1], y, w[2], h_fila)
+            if item['valor'] == "No":
+                self.set_font("ZapfDingbats", "", 10)
+                self.cell(w[2], h_fila, "4", 0, 0, "C")
+            self.set_font("Arial", "", 8)
+            self.rect(x + w[0] + w[1] + w[2], y, w[3], h_fila)
+            pintar_lineas(self, x + w[0] + w[1] + w[2], y, w[3], 4.5, l_obs)
+            self.set_xy(10, y + h_fila)
+
+    def reflexion(self, ref):
+        self.ln(5)
+        if self.get_y() > 230: self.add_page()
+        self.set_font("Arial", "B", 10)
+        self.set_fill_color(245, 245, 245)
+        self.cell(0, 8, " REFLEXIÓN FINAL", 1, 1, "L", True)
+        tits = {"funciona": "Lo que ha funcionado:", "dificultades": "Dificultades:", "mejoras": "Mejoras:"}
+        for k, v in ref.items():
+            self.set_font("Arial", "B", 9); self.ln(2)
+            self.cell(0, 5, tits.get(k, k), ln=True)
+            self.set_font("Arial", "", 9)
+            self.multi_cell(0, 5, str(v or "---"), 0, 'L')
+
+
+def a_bytes(out):
+    # --- GESTIÓN SEGURA DE BYTES ---
+    if isinstance(out, str):
+        return out.encode('latin-1')
+    return bytes(out)
+
+
+def construir_informe(items, evaluaciones, progreso=None, medir=None):
+    # progreso(fracción) se llama tras cada fila de la tabla y cada fila de alumnos;
+    # medir(nombre), si se pasa, mide cada etapa (ver perfil.Perfil.etapa)
+    total, hechos = max(len(items) + len(evaluaciones), 1), 0
+    def avanzar(n=1):
+        nonlocal hechos
+        hechos += n
+        if progreso: progreso(hechos / total)
+    pdf = EvaluacionPDF()
+    with etapa(medir, "tabla_maestra"): pdf.tabla_maestra(items, avanzar)
+    with etapa(medir, "bloque_alumnos"): pdf.bloque_alumnos(evaluaciones, avanzar)
+    with etapa(medir, "salida informe"): return a_bytes(pdf.output())
+
+
+def construir_autoevaluacion(registro, progreso=None, medir=None):
+    pdf = AutoevaluacionPDF()
+    with etapa(medir, "tabla_items"): pdf.tabla_items(registro['sda'], registro['fecha'], registro['items_evaluados'])
+    if progreso: progreso(0.8)
+    with etapa(medir, "reflexion"): pdf.reflexion(registro['reflexion_final'])
+    with etapa(medir, "salida autoevaluacion"): return a_bytes(pdf.output())
@@ -0,0 +1,99 @@
+# --- PERFILADO POR RERUN ---
+# Mide cada llamada a datos, cada sección de la interfaz y cada etapa de los PDF. Los
+# registros se agrupan por rerun para el panel lateral y se escriben como líneas JSON en
+# el logger "registro_docente.perfil" (a un archivo si se configura con configurar_log).
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+log = logging.getLogger("registro_docente.perfil")
+
+
+def configurar_log(ruta):
+    # Añade (una sola vez) un archivo de salida con una línea JSON por medida
+    if not any(getattr(h, "baseFilename", None) == ruta for h in log.handlers):
+        h = logging.FileHandler(ruta, encoding="utf-8")
+        h.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(h)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+class Perfil:
+    def __init__(self, sesion=None):
+        self.sesion = sesion
+        self.activo = True
+        self.rerun = 0
+        self.etiqueta = None
+        self.t_ini = None
+        self.registros = []
+        self.lock = threading.Lock()
+
+    def iniciar(self, etiqueta=None, activo=True):
+        with self.lock:
+            self.activo, self.etiqueta = activo, etiqueta
+            self.rerun += 1
+            self.t_ini = time.perf_counter()
+            self.registros = []
+
+    @contextmanager
+    def medir(self, tipo, nombre, **extra):
+        # Seguro entre hilos (lecturas de repo.lote y trabajos de la cola de PDF)
+        if not self.activo:
+            yield; return
+        t = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            ms = (time.perf_counter() - t) * 1000
+            reg = {"rerun": self.rerun, "tipo": tipo, "nombre": nombre, "ms": round(ms, 2),
+                   "inicio_ms": round((t - self.t_ini) * 1000, 2) if self.t_ini else None,
+                   "hilo": threading.current_thread().name, **extra}
+            if error: reg["error"] = error
+            with self.lock: self.registros.append(reg)
+            if log.isEnabledFor(logging.INFO):
+                log.info(json.dumps({"ts": time.time(), "sesion": self.sesion, "vista": self.etiqueta, **reg},
+                                    ensure_ascii=False, default=str))
+
+    def etapa(self, tipo):
+        # Función medir(nombre) para pasar a código que no conoce el perfil (p. ej. los PDF)
+        return lambda nombre, **extra: self.medir(tipo, nombre, **extra)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.t_ini) * 1000 if self.t_ini else 0.0
+
+    def resumen(self):
+        # {(tipo, nombre): (llamadas, ms totales, ms máximo)} del rerun actual
+        with self.lock: regs = list(self.registros)
+        res = {}
+        for r in regs:
+            n, tot, mx = res.get((r["tipo"], r["nombre"]), (0, 0.0, 0.0))
+            res[(r["tipo"], r["nombre"])] = (n + 1, tot + r["ms"], max(mx, r["ms"]))
+        return res
+
+
+def etapa(medir, nombre):
+    # Contexto de una etapa si hay medidor, o nada si no lo hay
+    return medir(nombre) if medir else nullcontext()
+
+
+class BackendMedido:
+    # Envuelve cualquier backend del repositorio (Supabase o almacén local) y mide cada llamada
+    OPERACIONES = ("consultar", "contar", "insertar", "actualizar", "upsert", "borrar")
+
+    def __init__(self, backend, perfil):
+        self.backend, self.perfil = backend, perfil
+
+    def __getattr__(self, nombre):
+        fn = getattr(self.backend, nombre)
+        if nombre not in self.OPERACIONES: return fn
+        def medida(tabla, *args, **kwargs):
+            with self.perfil.medir("datos", f"{nombre} {tabla}"):
+                return fn(tabla, *args, **kwargs)
+        return medida
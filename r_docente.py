@@ -1,392 +1,513 @@
-import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-from supabase import create_client
-from datetime import datetime
-
-# --- 1. CONFIGURACIÓN ---
-st.set_page_config(page_title="Suite Docente | Ángela Ortiz", layout="wide")
-
-@st.cache_resource
-def init_connection():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
-
-supabase = init_connection()
-
-# --- 2. CLASES PDF CORREGIDAS ---
-class EvaluacionPDF(FPDF):
-    def __init__(self):
-        super().__init__()
-        self.set_auto_page_break(auto=True, margin=15)
-        self.alias_nb_pages()
-
-    def header(self):
-        self.set_font("Arial", "B", 14)
-        self.cell(0, 10, "INFORME DE EVALUACIÓN DOCENTE", ln=True, align="C")
-        self.set_font("Arial", "I", 10)
-        self.set_text_color(255, 110, 64) 
-        self.cell(0, 5, "Especialista: Ángela Ortiz Ordóñez", ln=True, align="C")
-        self.set_text_color(0, 0, 0)
-        self.ln(10)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.cell(0, 10, f"Página {self.page_no()}/{{nb}}", align="C")
-
-    def tabla_maestra(self, items):
-        if not items:
-            self.add_page()
-            self.cell(0, 10, "No hay ítems configurados.")
-            return
-        self.add_page()
-        self.set_font("Arial", "B", 8)
-        self.set_fill_color(230, 230, 230)
-        w = [10, 35, 36.25, 36.25, 36.25, 36.25] 
-        headers = ["L.", "Descripción", "Nivel 1", "Nivel 2", "Nivel 3", "Nivel 4"]
-        for i, h in enumerate(headers): self.cell(w[i], 8, h, 1, 0, "C", True)
-        self.ln()
-        self.set_font("Arial", "", 7)
-        for it in items:
-            textos = [str(it.get('letra', '')), str(it.get('descripcion', '')), 
-                      str(it.get('nivel_1') or ""), str(it.get('nivel_2') or ""), 
-                      str(it.get('nivel_3') or ""), str(it.get('nivel_4') or "")]
-            alturas = [len(self.multi_cell(w[i], 4, textos[i], split_only=True)) * 4 for i in range(len(textos))]
-            h_fila = max(alturas) + 2
-            if self.get_y() + h_fila > 270: self.add_page()
-            x_ini, y_ini = self.get_x(), self.get_y()
-            for i, t in enumerate(textos):
-                style = 'FD' if i < 2 else 'D'
-                if i < 2: self.set_fill_color(245, 245, 245)
-                self.rect(x_ini, y_ini, w[i], h_fila, style=style)
-                self.set_xy(x_ini, y_ini)
-                self.multi_cell(w[i], 4, t, 0, 'L')
-                x_ini += w[i]
-            self.set_xy(10, y_ini + h_fila)
-
-    def bloque_alumnos(self, evaluaciones):
-        if not evaluaciones: return
-        self.add_page()
-        self.set_font("Arial", "B", 10)
-        self.set_fill_color(240, 240, 240)
-        self.cell(190, 8, "EVALUACIÓN ALUMNADO", 1, 1, "C", True)
-        self.ln(5)
-        
-        w_col, gap = 60, 5
-        # Iteramos de 3 en 3 para las filas de alumnos
-        for i in range(0, len(evaluaciones), 3):
-            y_inicio_fila = self.get_y()
-            # Si no cabe el bloque del alumno (aprox 60mm), nueva página
-            if y_inicio_fila > 220: 
-                self.add_page()
-                y_inicio_fila = self.get_y()
-            
-            max_y_alcanzado = y_inicio_fila
-            
-            for j in range(3):
-                idx = i + j
-                if idx < len(evaluaciones):
-                    e = evaluaciones[idx]
-                    x_pos = 10 + (j * (w_col + gap))
-                    self.set_xy(x_pos, y_inicio_fila)
-                    
-                    # Nombre del Alumno
-                    self.set_font("Arial", "B", 8)
-                    self.set_fill_color(240, 240, 240)
-                    nombre = str(e.get('nombre_alumno', 'Sin Nombre'))[:30]
-                    self.cell(w_col, 7, f" {nombre}", 1, 1, "L", True)
-                    
-                    # Items de puntuación
-                    y_item = self.get_y()
-                    puntos = e.get('puntos', {})
-                    if isinstance(puntos, dict):
-                        for letra, nivel in puntos.items():
-                            self.set_xy(x_pos, y_item)
-                            self.set_font("Arial", "", 8)
-                            self.cell(8, 6, f"{letra}:", "L", 0)
-                            
-                            # Dibujar círculos de niveles
-                            for n in range(1, 5):
-                                try:
-                                    # Verificamos que el nivel sea válido antes de comparar
-                                    if nivel is not None and str(nivel).isdigit() and int(nivel) == n:
-                                        self.set_fill_color(200, 200, 200)
-                                        self.ellipse(self.get_x() + 4.5, self.get_y() + 1, 4, 4, 'F')
-                                except: pass
-                                self.cell(13, 6, str(n), 0, 0, "C")
-                            
-                            self.cell(0.1, 6, "", "R", 1)
-                            y_item += 6
-                    
-                    self.line(x_pos, y_item, x_pos + w_col, y_item)
-                    max_y_alcanzado = max(max_y_alcanzado, y_item)
-            
-            self.set_y(max_y_alcanzado + 5)
-
-
-class AutoevaluacionPDF(FPDF):
-    def __init__(self):
-        super().__init__()
-        self.set_auto_page_break(auto=True, margin=15)
-        self.alias_nb_pages()
-
-    def header(self):
-        self.set_font("Arial", "B", 14)
-        self.cell(0, 10, "AUTOEVALUACIÓN DE LA PRÁCTICA DOCENTE", ln=True, align="C")
-        self.set_font("Arial", "I", 10)
-        self.set_text_color(255, 110, 64)
-        self.cell(0, 5, "Especialista: Ángela Ortiz Ordóñez", ln=True, align="C")
-        self.set_text_color(0, 0, 0)
-        self.ln(10)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.cell(0, 10, f"Página {self.page_no()}/{{nb}}", align="C")
-
-    def tabla_items(self, sda_num, fecha, datos_items):
-        self.add_page()
-        self.set_font("Arial", "B", 10)
-        self.set_fill_color(240, 240, 240)
-        self.cell(95, 10, f" SDA: {sda_num}", 1, 0, "L", True)
-        self.cell(95, 10, f" Fecha: {fecha}", 1, 1, "R", True)
-        self.ln()
-        w = [80, 15, 15, 80]
-        self.set_font("Arial", "B", 9)
-        headers = ["Ítem", "Sí", "No", "Observaciones"]
-        for i, h in enumerate(headers): self.cell(w[i], 8, h, 1, 0, "C", True)
-        self.ln()
-        self.set_font("Arial", "", 8)
-        for item in datos_items:
-            obs_txt = str(item.get('obs') or "")
-            nom_txt = str(item.get('nombre') or "")
-            l_obs = self.multi_cell(w[3], 4, obs_txt, split_only=True)
-            l_nom = self.multi_cell(w[0], 4, nom_txt, split_only=True)
-            h_fila = max(len(l_obs), len(l_nom)) * 4.5
-            h_fila = max(h_fila, 8)
-            if self.get_y() + h_fila > 260: self.add_page()
-            x, y = self.get_x(), self.get_y()
-            self.rect(x, y, w[0], h_fila)
-            self.multi_cell(w[0], 4.5, nom_txt, 0, 'L')
-            self.set_xy(x + w[0], y)
-            self.rect(x + w[0], y, w[1], h_fila)
-            if item['valor'] == "Sí":
-                self.set_font("ZapfDingbats", "", 10)
-                self.cell(w[1], h_fila, "4", 0, 0, "C")
-            self.set_xy(x + w[0] + w[1], y)
-            self.rect(x + w[0] + w[1], y, w[2], h_fila)
-            if item['valor'] == "No":
-                self.set_font("ZapfDingbats", "", 10)
-                self.cell(w[2], h_fila, "4", 0, 0, "C")
-            self.set_font("Arial", "", 8)
-            self.set_xy(x + w[0] + w[1] + w[2], y)
-            self.rect(x + w[0] + w[1] + w[2], y, w[3], h_fila)
-            self.multi_cell(w[3], 4.5, obs_txt, 0, 'L')
-            self.set_xy(10, y + h_fila)
-
-    def reflexion(self, ref):
-        self.ln(5)
-        if self.get_y() > 230: self.add_page()
-        self.set_font("Arial", "B", 10)
-        self.set_fill_color(245, 245, 245)
-        self.cell(0, 8, " REFLEXIÓN FINAL", 1, 1, "L", True)
-        tits = {"funciona": "Lo que ha funcionado:", "dificultades": "Dificultades:", "mejoras": "Mejoras:"}
-        for k, v in ref.items():
-            self.set_font("Arial", "B", 9); self.ln(2)
-            self.cell(0, 5, tits.get(k, k), ln=True)
-            self.set_font("Arial", "", 9)
-            self.multi_cell(0, 5, str(v or "---"), 0, 'L')
-
-def cabecera_estilizada(titulo):
-    st.markdown(f"""<div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; border-left: 8px solid #4f64af; margin-bottom: 20px;">
-        <h1 style="margin: 0; color: #1e3d59; font-family: 'Helvetica Neue', sans-serif; font-size: 24px;">{titulo}</h1>
-        <p style="margin: 0; color: #4f64af; font-size: 1.2rem; font-weight: bold;">Maestra Especialista: <span style="color: #ff6e40;">Ángela Ortiz Ordóñez</span></p>
-        </div>""", unsafe_allow_html=True)
-
-# --- 4. LÓGICA ---
-with st.sidebar:
-    st.title("🛠️ Menú")
-    opcion = st.radio("Herramienta:", ["👥 Registro de Alumnos", "📝 Autoevaluación Práctica"])
-
-if opcion == "👥 Registro de Alumnos":
-    cabecera_estilizada("🎓 Registro Aula P.T.")
-    tab_alu, tab_conf, tab_eval, tab_hist = st.tabs(["👥 Alumnos", "⚙️ Ítems", "📝 Evaluación", "📅 Histórico"])
-    
-    res_a_raw = supabase.table("alumnos").select("*").execute().data
-    orden_cursos = ["INF 3", "INF 4", "INF 5", "1º", "2º", "3º", "4º", "5º", "6º"]
-    res_a = sorted(res_a_raw, key=lambda x: (orden_cursos.index(x["curso"]) if x["curso"] in orden_cursos else 999, x["nombre"]))
-    
-    res_i_raw = supabase.table("configuracion_items").select("*").order("letra").execute().data
-    res_i = []
-    for item in res_i_raw:
-        for n in ['nivel_1', 'nivel_2', 'nivel_3', 'nivel_4']:
-            item[n] = str(item.get(n) or "").replace("None", "").strip()
-        res_i.append(item)
-
-    with tab_alu:
-        c_sel, c_del = st.columns([3, 1])
-        sel_a = c_sel.selectbox("Seleccionar Alumno", ["+ Nuevo"] + [f"{a['nombre']} ({a['curso']})" for a in res_a])
-        v_id, v_nom, v_cur = 0, "", ""
-        if sel_a != "+ Nuevo":
-            d = next(a for a in res_a if f"{a['nombre']} ({a['curso']})" == sel_a)
-            v_id, v_nom, v_cur = d['id'], d['nombre'], d['curso']
-            if c_del.button("🗑️ Eliminar Alumno"):
-                supabase.table("alumnos").delete().eq("id", v_id).execute(); st.rerun()
-        with st.form("f_alu"):
-            c1, c2 = st.columns(2); n_in = c1.text_input("Nombre", v_nom); cur_in = c2.text_input("Curso", v_cur)
-            if st.form_submit_button("💾 Guardar"):
-                if v_id == 0: supabase.table("alumnos").insert({"nombre": n_in, "curso": cur_in}).execute()
-                else: supabase.table("alumnos").update({"nombre": n_in, "curso": cur_in}).eq("id", v_id).execute()
-                st.rerun()
-
-    with tab_conf:
-        c_sel_i, c_del_i = st.columns([3, 1])
-        sel_i = c_sel_i.selectbox("Seleccionar Ítem", ["+ Nuevo"] + [f"{i['letra']} - {i['descripcion'][:30]}" for i in res_i])
-        v_let, v_des, v_n = "", "", [""] * 4
-        if sel_i != "+ Nuevo":
-            d = next(i for i in res_i if f"{i['letra']} - {i['descripcion'][:30]}" == sel_i)
-            v_let, v_des, v_n = d['letra'], d['descripcion'], [d['nivel_1'], d['nivel_2'], d['nivel_3'], d['nivel_4']]
-            if c_del_i.button("🗑️ Eliminar Ítem"):
-                supabase.table("configuracion_items").delete().eq("letra", v_let).execute(); st.rerun()
-        with st.form("f_item"):
-            c1, c2 = st.columns([1, 4]); l_in = c1.text_input("Letra", v_let).upper(); d_in = c2.text_input("Descripción", v_des)
-            ca, cb = st.columns(2); n1 = ca.text_area("N1", v_n[0]); n2 = cb.text_area("N2", v_n[1]); n3 = ca.text_area("N3", v_n[2]); n4 = cb.text_area("N4", v_n[3])
-            if st.form_submit_button("💾 Guardar"):
-                supabase.table("configuracion_items").upsert({"letra": l_in, "descripcion": d_in, "nivel_1": n1, "nivel_2": n2, "nivel_3": n3, "nivel_4": n4}).execute(); st.rerun()
-
-    with tab_eval:
-        if not res_a: st.warning("No hay alumnos.")
-        else:
-            c1, c2 = st.columns(2); fe_ev = c2.date_input("Fecha", datetime.now())
-            evals_h = supabase.table("evaluaciones_alumnos").select("nombre_alumno").eq("fecha", fe_ev.isoformat()).execute().data
-            set_ev = {ev['nombre_alumno'] for ev in evals_h}
-            pend, comp = [], []
-            for a in res_a:
-                nom = f"{a['nombre']} ({a['curso']})"
-                if nom in set_ev: comp.append(f"✅ {nom}")
-                else: pend.append(nom)
-            al_sel = c1.selectbox("Elegir Alumno", pend + comp)
-            is_done = al_sel.startswith("✅")
-            with st.form("f_ev"):
-                pts = {}
-                for it in res_i:
-                    st.write(f"**{it['letra']} - {it['descripcion']}**")
-                    pts[it['letra']] = st.radio(f"Nivel {it['letra']}", [1, 2, 3, 4], format_func=lambda x, it=it: f"N{x}: {it.get(f'nivel_{x}', '')}", key=f"e_{it['letra']}_{al_sel}", horizontal=True)
-                if st.form_submit_button("📝 Registrar", disabled=is_done):
-                    supabase.table("evaluaciones_alumnos").insert({"nombre_alumno": al_sel, "puntos": pts, "fecha": fe_ev.isoformat()}).execute(); st.rerun()
-
-    with tab_hist:
-        evals = supabase.table("evaluaciones_alumnos").select("*").order("fecha", desc=True).execute().data
-        if evals:
-            df = pd.DataFrame(evals)
-            df['f_corta'] = df['fecha'].map(lambda x: x[:10])
-            dias = df['f_corta'].unique()
-            c_dia, c_pdf = st.columns([3, 1])
-            sel_d = c_dia.selectbox("Filtrar Fecha", ["Ver todos"] + list(dias))
-            
-            if c_pdf.button("🖨️ Generar PDF Informe"):
-                pdf = EvaluacionPDF()
-                pdf.tabla_maestra(res_i)
-                ev_f = evals if sel_d == "Ver todos" else [e for e in evals if e['fecha'][:10] == sel_d]
-                pdf.bloque_alumnos(ev_f)
-                
-                # --- GESTIÓN SEGURA DE BYTES ---
-                try:
-                    out_bytes = pdf.output()
-                    if isinstance(out_bytes, str):
-                        out_bytes = out_bytes.encode('latin-1')
-                    elif isinstance(out_bytes, bytearray):
-                        out_bytes = bytes(out_bytes)
-                    
-                    st.download_button("⬇️ Descargar PDF", out_bytes, f"Informe_{sel_d}.pdf", "application/pdf")
-                except Exception as e:
-                    st.error(f"Error al generar el PDF: {e}")
-
-            for d in dias:
-                with st.expander(f"📅 Sesiones {d}"):
-                    for _, r in df[df['f_corta'] == d].iterrows():
-                        c1, c2 = st.columns([5, 1]); c1.write(f"👤 **{r['nombre_alumno']}**")
-                        if c2.button("🗑️", key=f"h_{r['id']}"):
-                            supabase.table("evaluaciones_alumnos").delete().eq("id", r['id']).execute(); st.rerun()
-
-else: # --- AUTOEVALUACIÓN ---
-    cabecera_estilizada("📝 Registro de Autoevaluación")
-    tab1, tab2, tab3 = st.tabs(["📝 Formulario", "📅 Historial", "⚙️ Configurar Ítems"])
-    
-    if "edit_id" not in st.session_state: st.session_state.edit_id = None
-    if "datos_edicion" not in st.session_state: st.session_state.datos_edicion = {}
-
-    with tab3:
-        it_ae = supabase.table("items_autoevaluacion").select("*").order("id").execute().data
-        with st.form("n_ae"):
-            n = st.text_input("Nuevo Ítem")
-            if st.form_submit_button("Añadir"):
-                supabase.table("items_autoevaluacion").insert({"nombre": n}).execute(); st.rerun()
-        for i in it_ae:
-            c1, c2 = st.columns([5,1]); c1.write(f"• {i['nombre']}")
-            if c2.button("🗑️", key=f"dae_{i['id']}"):
-                supabase.table("items_autoevaluacion").delete().eq("id", i['id']).execute(); st.rerun()
-
-    with tab1:
-        it_ae = supabase.table("items_autoevaluacion").select("*").order("id").execute().data
-        es_edicion = st.session_state.edit_id is not None
-        if es_edicion:
-            st.warning(f"⚠️ Editando SDA {st.session_state.datos_edicion.get('sda')}")
-            if st.button("❌ Cancelar"): st.session_state.edit_id = None; st.rerun()
-        
-        d = st.session_state.datos_edicion
-        f_v = datetime.fromisoformat(d.get('fecha')) if d.get('fecha') else datetime.now()
-        s_v = int(d.get('sda', 1))
-        it_e_v = {x['nombre']: x for x in d.get('items_evaluados', [])}
-        prefix = "edit" if es_edicion else "new"
-
-        c1, c2 = st.columns(2)
-        f_s = c1.date_input("Fecha", value=f_v, key=f"{prefix}_fecha")
-        s_s = c2.number_input("SDA", 1, 20, value=s_v, key=f"{prefix}_sda")
-
-        eval_ae = []
-        for i in it_ae:
-            st.write(f"**{i['nombre']}**")
-            ca, cb = st.columns([1,4])
-            v_g = it_e_v.get(i['nombre'], {}).get('valor', "No")
-            o_g = it_e_v.get(i['nombre'], {}).get('obs', "")
-            v = ca.radio("OK", ["Sí", "No"], index=0 if v_g=="Sí" else 1, key=f"{prefix}_r_{i['id']}", horizontal=True)
-            o = cb.text_input("Obs", value=o_g, key=f"{prefix}_o_{i['id']}")
-            eval_ae.append({"nombre": i['nombre'], "valor": v, "obs": o})
-
-        r_v = d.get('reflexion_final', {})
-        ref1 = st.text_area("Funciona", r_v.get('funciona', ""), key=f"{prefix}_ref1")
-        ref2 = st.text_area("Dificultades", r_v.get('dificultades', ""), key=f"{prefix}_ref2")
-        ref3 = st.text_area("Mejora", r_v.get('mejoras', ""), key=f"{prefix}_ref3")
-
-        if st.button("💾 Guardar", type="primary"):
-            payload = {"fecha": f_s.isoformat(), "sda": s_s, "items_evaluados": eval_ae, "reflexion_final": {"funciona": ref1, "dificultades": ref2, "mejoras": ref3}}
-            if es_edicion: supabase.table("autoevaluaciones").update(payload).eq("id", st.session_state.edit_id).execute()
-            else: supabase.table("autoevaluaciones").insert(payload).execute()
-            st.session_state.edit_id = None; st.success("Guardado"); st.rerun()
-
-    with tab2:
-        regs = supabase.table("autoevaluaciones").select("*").order("fecha", desc=True).execute().data
-        for r in regs:
-            with st.expander(f"📅 {r['fecha']} - SDA {r['sda']}"):
-                c1, c2, c3 = st.columns(3)
-                if c1.button("🖨️ PDF", key=f"pdf_ae_{r['id']}"):
-                    pdf_ae = AutoevaluacionPDF()
-                    pdf_ae.tabla_items(r['sda'], r['fecha'], r['items_evaluados'])
-                    pdf_ae.reflexion(r['reflexion_final'])
-                    
-                    try:
-                        out_ae = pdf_ae.output()
-                        if isinstance(out_ae, str):
-                            out_ae = out_ae.encode('latin-1')
-                        elif isinstance(out_ae, bytearray):
-                            out_ae = bytes(out_ae)
-                        
-                        st.download_button("⬇️ Bajar PDF", out_ae, f"Auto_{r['fecha']}.pdf", "application/pdf", key=f"dl_ae_{r['id']}")
-                    except Exception as e:
-                        st.error(f"Error al generar PDF: {e}")
-                
-                if c2.button("✏️", key=f"ed_ae_{r['id']}"):
-                    st.session_state.edit_id = r['id']; st.session_state.datos_edicion = r; st.rerun()
-                if c3.button("🗑️", key=f"del_ae_{r['id']}"):
-                    supabase.table("autoevaluaciones").delete().eq("id", r['id']).execute(); st.rerun()
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+from supabase import create_client
+import uuid
+from datetime import date, datetime, timedelta
+from datos import BackendSupabase, Repositorio
+from almacen_local import AlmacenLocal, Sincronizador
+from pdf_docente import construir_informe, construir_autoevaluacion
+from informes import ColaPDF, clave_contenido, exportar_zip
+from analitica import MatrizProgreso
+from roster import Roster
+from historial_ae import COLUMNAS as COLUMNAS_AE, HistorialAE, ahora
+import importacion
+from perfil import BackendMedido, Perfil, configurar_log
+
+# --- 1. CONFIGURACIÓN ---
+st.set_page_config(page_title="Suite Docente | Ángela Ortiz", layout="wide")
+
+@st.cache_resource
+def init_connection():
+    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+
+supabase = init_connection()
+
+# Modo local: con ALMACEN_LOCAL en secrets se lee de SQLite y se sincroniza en segundo plano
+@st.cache_resource
+def init_almacen():
+    ruta = st.secrets.get("ALMACEN_LOCAL")
+    if not ruta: return None, None
+    almacen = AlmacenLocal(ruta)
+    return almacen, Sincronizador(almacen, supabase).iniciar()
+
+almacen, sincronizador = init_almacen()
+
+# Con PERFIL_LOG en secrets cada medida del perfilado se escribe como una línea JSON
+@st.cache_resource
+def init_log_perfil():
+    ruta = st.secrets.get("PERFIL_LOG")
+    if ruta: configurar_log(ruta)
+    return bool(ruta)
+
+log_perfil = init_log_perfil()
+
+# Repositorio y perfil por sesión de usuario; el backend va envuelto para medir cada llamada
+if "repo" not in st.session_state:
+    st.session_state.perfil = Perfil(sesion=uuid.uuid4().hex[:8])
+    backend = BackendMedido(almacen or BackendSupabase(supabase), st.session_state.perfil)
+    if almacen: st.session_state.repo = Repositorio(backend, ttl=5, al_escribir=sincronizador.avisar)
+    else: st.session_state.repo = Repositorio(backend)
+repo, perfil = st.session_state.repo, st.session_state.perfil
+
+def cabecera_estilizada(titulo):
+    st.markdown(f"""<div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; border-left: 8px solid #4f64af; margin-bottom: 20px;">
+        <h1 style="margin: 0; color: #1e3d59; font-family: 'Helvetica Neue', sans-serif; font-size: 24px;">{titulo}</h1>
+        <p style="margin: 0; color: #4f64af; font-size: 1.2rem; font-weight: bold;">Maestra Especialista: <span style="color: #ff6e40;">Ángela Ortiz Ordóñez</span></p>
+        </div>""", unsafe_allow_html=True)
+
+# --- 3. PDF EN SEGUNDO PLANO ---
+@st.cache_resource
+def cola_pdf():
+    return ColaPDF()
+
+@st.fragment(run_every=1)
+def esperar_pdf(clave):
+    # Solo sondea mientras el PDF se genera; al terminar, un rerun completo pinta el resultado
+    # y el fragmento deja de existir
+    fraccion = cola_pdf().en_curso(clave)
+    if fraccion is None: st.rerun()
+    st.progress(fraccion, text="Generando PDF…")
+
+def trabajo_pdf(slot, etiqueta):
+    clave, archivo = st.session_state.pdf_trabajos[slot]
+    estado, valor = cola_pdf().estado(clave)
+    if estado == "hecho":
+        st.download_button(etiqueta, valor, archivo, "application/pdf", key=f"dl_{slot}")
+    elif estado == "en_curso":
+        esperar_pdf(clave)
+    else:
+        # Fallido, o expulsado de la caché: se libera el hueco
+        if estado == "error": st.error(f"Error al generar el PDF: {valor}")
+        del st.session_state.pdf_trabajos[slot]
+
+# --- 4. LÓGICA ---
+def cargar_roster():
+    filas = repo.select("alumnos")
+    with perfil.medir("seccion", "ordenar roster"): return Roster(filas)
+
+def cargar_items():
+    res_i = []
+    for item in repo.select("configuracion_items", orden="letra"):
+        for n in ['nivel_1', 'nivel_2', 'nivel_3', 'nivel_4']:
+            item[n] = str(item.get(n) or "").replace("None", "").strip()
+        res_i.append(item)
+    return res_i
+
+def importar_exportar(clave, filas, columnas, planificar):
+    # Exportación y carga masiva con vista previa; 'planificar(bloques, borrar_ausentes)' devuelve el Plan
+    with st.expander("📥 Importar / 📤 Exportar"):
+        # Los archivos se generan al pulsar el botón, no en cada rerun
+        c_csv, c_xlsx = st.columns(2)
+        c_csv.download_button("📤 CSV", lambda: importacion.exportar(filas, columnas), f"{clave}.csv", "text/csv", key=f"{clave}_csv")
+        if importacion.openpyxl is not None:
+            c_xlsx.download_button("📤 XLSX", lambda: importacion.exportar(filas, columnas, "xlsx"), f"{clave}.xlsx",
+                                   "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", key=f"{clave}_xlsx")
+        # Cambiar la key vacía el selector de archivo tras aplicar
+        n_carga = st.session_state.setdefault(f"{clave}_cargas", 0)
+        arch = st.file_uploader(f"Archivo CSV o XLSX (columnas: {', '.join(columnas)})", ["csv", "xlsx"], key=f"{clave}_arch_{n_carga}")
+        if arch is None: return
+        borrar = st.checkbox("Borrar los que no estén en el archivo", key=f"{clave}_borrar")
+        try:
+            plan = planificar(importacion.leer_bloques(arch, arch.name), borrar)
+        except Exception as e:
+            st.error(f"No se pudo leer el archivo: {e}"); return
+        st.caption(f"➕ {len(plan.altas)} altas · ✏️ {len(plan.cambios)} cambios · 🗑️ {len(plan.bajas)} bajas · {plan.sin_cambios} sin cambios")
+        if plan.errores:
+            st.error(f"{len(plan.errores)} filas con errores; no se aplicará nada.")
+            st.dataframe(pd.DataFrame(plan.errores, columns=["Fila", "Error"]), hide_index=True, width="stretch")
+            return
+        for titulo, filas_p in (("Altas", plan.altas), ("Cambios", plan.cambios)):
+            if filas_p: st.markdown(f"**{titulo}**"); st.dataframe(pd.DataFrame(filas_p), hide_index=True, width="stretch")
+        if plan.bajas: st.warning(f"Se borrarán: {', '.join(map(str, plan.bajas))}")
+        if (plan.altas or plan.cambios or plan.bajas) and st.button("✅ Aplicar cambios", key=f"{clave}_aplicar"):
+            importacion.aplicar(repo, plan)
+            st.session_state[f"{clave}_cargas"] += 1; st.rerun()
+
+# --- VISTAS: REGISTRO DE ALUMNOS ---
+def vista_alumnos():
+    roster = cargar_roster()
+    importar_exportar("alumnos", [(a.id, a.nombre, a.curso) for a in roster.alumnos], importacion.COLUMNAS_ALUMNOS,
+                      lambda bloques, borrar: importacion.plan_alumnos(bloques, roster, borrar))
+    c_sel, c_del = st.columns([3, 1])
+    sel_a = c_sel.selectbox("Seleccionar Alumno", [0] + roster.ids(), format_func=lambda i: roster.por_id[i].etiqueta if i else "+ Nuevo")
+    v_id, v_nom, v_cur = 0, "", ""
+    if sel_a:
+        d = roster.por_id[sel_a]
+        v_id, v_nom, v_cur = d.id, d.nombre, d.curso
+        if c_del.button("🗑️ Eliminar Alumno"):
+            repo.delete("alumnos", [("eq", "id", v_id)]); st.rerun()
+    with st.form("f_alu"):
+        c1, c2 = st.columns(2); n_in = c1.text_input("Nombre", v_nom); cur_in = c2.text_input("Curso", v_cur)
+        if st.form_submit_button("💾 Guardar"):
+            if v_id == 0: repo.insert("alumnos", {"nombre": n_in, "curso": cur_in})
+            else: repo.update("alumnos", {"nombre": n_in, "curso": cur_in}, [("eq", "id", v_id)])
+            st.rerun()
+
+def vista_items():
+    res_i = cargar_items()
+    importar_exportar("items", [[i.get(c) for c in importacion.COLUMNAS_ITEMS] for i in res_i], importacion.COLUMNAS_ITEMS,
+                      lambda bloques, borrar: importacion.plan_items(bloques, res_i, borrar))
+    c_sel_i, c_del_i = st.columns([3, 1])
+    sel_i = c_sel_i.selectbox("Seleccionar Ítem", ["+ Nuevo"] + [f"{i['letra']} - {i['descripcion'][:30]}" for i in res_i])
+    v_let, v_des, v_n = "", "", [""] * 4
+    if sel_i != "+ Nuevo":
+        d = next(i for i in res_i if f"{i['letra']} - {i['descripcion'][:30]}" == sel_i)
+        v_let, v_des, v_n = d['letra'], d['descripcion'], [d['nivel_1'], d['nivel_2'], d['nivel_3'], d['nivel_4']]
+        if c_del_i.button("🗑️ Eliminar Ítem"):
+            repo.delete("configuracion_items", [("eq", "letra", v_let)]); st.rerun()
+    with st.form("f_item"):
+        c1, c2 = st.columns([1, 4]); l_in = c1.text_input("Letra", v_let).upper(); d_in = c2.text_input("Descripción", v_des)
+        ca, cb = st.columns(2); n1 = ca.text_area("N1", v_n[0]); n2 = cb.text_area("N2", v_n[1]); n3 = ca.text_area("N3", v_n[2]); n4 = cb.text_area("N4", v_n[3])
+        if st.form_submit_button("💾 Guardar"):
+            repo.upsert("configuracion_items", {"letra": l_in, "descripcion": d_in, "nivel_1": n1, "nivel_2": n2, "nivel_3": n3, "nivel_4": n4}); st.rerun()
+
+def evaluados_en(roster, fe_ev):
+    # ids ya evaluados en la fecha (consulta por el índice de fecha, migración 003)
+    evals_h = repo.select("evaluaciones_alumnos", "alumno_id, nombre_alumno", [("eq", "fecha", fe_ev.isoformat())])
+    return {roster.id_de(ev) for ev in evals_h}
+
+def vista_evaluacion():
+    c1, c2 = st.columns(2); fe_ev = c2.date_input("Fecha", datetime.now())
+    d = repo.lote(roster=cargar_roster, items=cargar_items,
+                  evals_h=lambda: repo.select("evaluaciones_alumnos", "alumno_id, nombre_alumno", [("eq", "fecha", fe_ev.isoformat())]))
+    roster, res_i = d["roster"], d["items"]
+    if not roster: st.warning("No hay alumnos."); return
+    if "aviso_ev" in st.session_state: st.success(st.session_state.pop("aviso_ev"))
+    set_ev = {roster.id_de(ev) for ev in d["evals_h"]}
+    pend = [i for i in roster.ids() if i not in set_ev]
+    comp = [i for i in roster.ids() if i in set_ev]
+    if st.toggle("👥 Evaluar la clase completa", key="ev_clase"):
+        evaluacion_clase(roster, res_i, pend, fe_ev); return
+    al_sel = c1.selectbox("Elegir Alumno", pend + comp, format_func=lambda i: f"✅ {roster.por_id[i].etiqueta}" if i in set_ev else roster.por_id[i].etiqueta)
+    is_done = al_sel in set_ev
+    with st.form("f_ev"):
+        pts = {}
+        for it in res_i:
+            st.write(f"**{it['letra']} - {it['descripcion']}**")
+            pts[it['letra']] = st.radio(f"Nivel {it['letra']}", [1, 2, 3, 4], format_func=lambda x, it=it: f"N{x}: {it.get(f'nivel_{x}', '')}", key=f"e_{it['letra']}_{al_sel}", horizontal=True)
+        if st.form_submit_button("📝 Registrar", disabled=is_done):
+            repo.insert("evaluaciones_alumnos", {"alumno_id": al_sel, "nombre_alumno": roster.por_id[al_sel].etiqueta, "puntos": pts, "fecha": fe_ev.isoformat()}); st.rerun()
+
+def evaluacion_clase(roster, res_i, pend, fe_ev):
+    # Rejilla alumnos x letras: se valida en local y se envía en un único insert
+    if not pend: st.success("Todos los alumnos están evaluados en esta fecha."); return
+    if not res_i: st.warning("No hay ítems configurados."); return
+    letras = [it['letra'] for it in res_i]
+    df = pd.DataFrame({"Alumno": [roster.por_id[i].etiqueta for i in pend],
+                       **{l: pd.Series([None] * len(pend), dtype="Int64") for l in letras}}, index=pend)
+    cols = {l: st.column_config.SelectboxColumn(l, options=[1, 2, 3, 4], help=it['descripcion'])
+            for l, it in zip(letras, res_i)}
+    with st.form(f"f_ev_clase_{fe_ev}"):
+        ed = st.data_editor(df, column_config=cols, disabled=["Alumno"], hide_index=True, width="stretch")
+        if not st.form_submit_button("📝 Registrar clase"): return
+
+    valores = ed[letras]
+    completas = valores.notna().all(axis=1)
+    incompletas = valores.notna().any(axis=1) & ~completas
+    if incompletas.any():
+        st.error("Faltan niveles para: " + ", ".join(ed.loc[incompletas, "Alumno"])); return
+    if not completas.any(): st.warning("No hay evaluaciones que registrar."); return
+
+    # Comprobación final contra la base de datos, por si otra sesión ya registró a alguien
+    repo.cache.invalidar("evaluaciones_alumnos")
+    set_ev = evaluados_en(roster, fe_ev)
+    filas = [{"alumno_id": i, "nombre_alumno": r["Alumno"], "puntos": {l: int(r[l]) for l in letras}, "fecha": fe_ev.isoformat()}
+             for i, r in ed[completas].iterrows() if i not in set_ev]
+    if filas: repo.insert("evaluaciones_alumnos", filas)
+    st.session_state.aviso_ev = f"Registradas {len(filas)} evaluaciones."
+    st.rerun()
+
+HIST_POR_PAGINA = 50
+
+def vista_historico():
+    # Filtro de fechas y paginación resueltos en la consulta; el listado no trae 'puntos'
+    c_des, c_has = st.columns(2)
+    hoy = datetime.now().date()
+    f_des = c_des.date_input("Desde", hoy - timedelta(days=90), key="h_desde")
+    f_has = c_has.date_input("Hasta", hoy, key="h_hasta")
+    filtros = [("gte", "fecha", f_des.isoformat()), ("lt", "fecha", (f_has + timedelta(days=1)).isoformat())]
+    with st.expander("📦 Exportar informes del periodo (ZIP)"):
+        st.caption("Un PDF por alumno con todas sus evaluaciones del periodo, más cada autoevaluación de SDA.")
+        if st.button("📦 Generar ZIP", key="h_zip"):
+            barra = st.progress(0.0, text="Generando informes…")
+            d = repo.lote(roster=cargar_roster, items=cargar_items, n_autos=lambda: repo.contar("autoevaluaciones", filtros))
+            roster = d["roster"]
+            # Las filas sin migrar se reparten antes entre los alumnos actuales; el resto se pide
+            # alumno a alumno (en páginas por id) según el ZIP lanza cada informe
+            columnas = "id, alumno_id, nombre_alumno, puntos, fecha"
+            sueltas = {}
+            for p in repo.paginas("evaluaciones_alumnos", columnas, [*filtros, ("is_", "alumno_id", "null")]):
+                for e in roster.con_nombres_actuales(p): sueltas.setdefault(e['alumno_id'], []).append(e)
+            def evaluaciones_de(i):
+                if i is None: return sueltas.get(None, [])
+                evs = [e for p in repo.paginas("evaluaciones_alumnos", columnas, [*filtros, ("eq", "alumno_id", i)]) for e in p]
+                return sorted(roster.con_nombres_actuales(evs) + sueltas.get(i, []), key=lambda e: e['fecha'])
+            autos = (r for p in repo.paginas("autoevaluaciones", filtros=filtros) for r in p)
+            with perfil.medir("pdf", "zip", alumnos=len(roster), autoevaluaciones=d["n_autos"]):
+                salida = exportar_zip(d["items"], [(a.id, a.etiqueta) for a in roster.alumnos], evaluaciones_de,
+                                      autos, d["n_autos"], progreso=lambda x: barra.progress(x, text="Generando informes…"))
+            # download_button no acepta el SpooledTemporaryFile: se le pasan los bytes, así que al
+            # final el ZIP completo sí pasa por memoria (la generación no, va PDF a PDF)
+            with salida: zip_b = salida.read()
+            st.download_button("⬇️ Descargar ZIP", zip_b, f"Informes_{f_des}_{f_has}.zip", "application/zip")
+    def pagina(p):
+        ini = (p - 1) * HIST_POR_PAGINA
+        return repo.select("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, fecha", filtros,
+                           orden="fecha", desc=True, rango=(ini, ini + HIST_POR_PAGINA - 1))
+
+    # Recuento y página pedida (la del rerun anterior) a la vez
+    pag_prev = st.session_state.get("h_pag", 1)
+    d = repo.lote(total=lambda: repo.contar("evaluaciones_alumnos", filtros), filas=lambda: pagina(pag_prev), roster=cargar_roster)
+    roster = d["roster"]
+    total = d["total"]
+    if not total: st.info("No hay evaluaciones en ese periodo."); return
+
+    n_pag = (total - 1) // HIST_POR_PAGINA + 1
+    if pag_prev > n_pag: st.session_state.h_pag = pag_prev = 1
+    c_pag, c_tot = st.columns([1, 3])
+    pag = c_pag.number_input("Página", 1, n_pag, key="h_pag") if n_pag > 1 else 1
+    c_tot.caption(f"{total} evaluaciones · página {pag} de {n_pag}")
+    filas = d["filas"] if pag == pag_prev else pagina(pag)
+    with perfil.medir("seccion", "filas histórico"):
+        filas = roster.con_nombres_actuales(filas)
+        for f in filas: f['f_corta'] = f['fecha'][:10]
+        dias = list(dict.fromkeys(f['f_corta'] for f in filas))
+
+    c_dia, c_pdf = st.columns([3, 1])
+    sel_d = c_dia.selectbox("Abrir día", ["Ninguno"] + dias, key="h_dia")
+
+    f_dia = None if sel_d == "Ninguno" else [("gte", "fecha", sel_d), ("lt", "fecha", (date.fromisoformat(sel_d) + timedelta(days=1)).isoformat())]
+    if c_pdf.button("🖨️ Generar PDF Informe"):
+        # Solo aquí se descargan los 'puntos' del periodo (o del día abierto), en páginas por id
+        # porque un periodo largo pasa de las 1000 filas que devuelve cada consulta
+        f_pdf = f_dia or filtros
+        ev_f = [e for p in repo.paginas("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, puntos, fecha", f_pdf) for e in p]
+        ev_f = sorted(roster.con_nombres_actuales(ev_f), key=lambda e: e['fecha'], reverse=True)
+        nombre_pdf = f"{f_des}_{f_has}" if sel_d == "Ninguno" else sel_d
+        res_i = cargar_items()
+        clave = cola_pdf().enviar(clave_contenido("informe", res_i, ev_f, f_pdf), construir_informe, res_i, ev_f, medir=perfil.etapa("pdf"))
+        st.session_state.pdf_trabajos["hist"] = (clave, f"Informe_{nombre_pdf}.pdf")
+    if "hist" in st.session_state.pdf_trabajos:
+        trabajo_pdf("hist", "⬇️ Descargar PDF")
+
+    if sel_d == "Ninguno":
+        # Un único widget para toda la página
+        with perfil.medir("seccion", "tabla histórico"):
+            st.dataframe(pd.DataFrame(filas, columns=["f_corta", "nombre_alumno"]).rename(columns={"f_corta": "Fecha", "nombre_alumno": "Alumno"}),
+                         hide_index=True, width="stretch")
+        return
+
+    # Día abierto: todas sus evaluaciones (aunque el día caiga entre dos páginas), con sus puntos
+    detalle = roster.con_nombres_actuales(repo.select("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, puntos", f_dia))
+    if not detalle: st.info("Ese día ya no tiene evaluaciones."); return
+    detalle.sort(key=lambda r: r['nombre_alumno'])
+    st.markdown(f"**📅 Sesiones {sel_d}**")
+    for r in detalle:
+        c1, c2 = st.columns([5, 1]); c1.write(f"👤 **{r['nombre_alumno']}**")
+        if isinstance(r.get('puntos'), dict):
+            c1.caption(" · ".join(f"{k}: N{v}" for k, v in r['puntos'].items()))
+        if c2.button("🗑️", key=f"h_{r['id']}"):
+            repo.delete("evaluaciones_alumnos", [("eq", "id", r['id'])]); st.rerun()
+
+def matriz_progreso(roster):
+    # Matriz de la sesión: solo se piden las evaluaciones con id posterior al último procesado,
+    # sea cual sea su fecha, en páginas por id. Si luego no cuadra con el recuento de la tabla
+    # es que hubo borrados (aunque se compensen con altas) y se reconstruye. Las filas sin
+    # migrar se enlazan con el roster antes de entrar, para no tener al alumno dos veces
+    d = repo.lote(total=lambda: repo.contar("evaluaciones_alumnos"),
+                  ultimo=lambda: repo.select("evaluaciones_alumnos", "id", orden="id", desc=True, rango=(0, 0)))
+    max_id = d["ultimo"][0]["id"] if d["ultimo"] else 0
+    def al_dia(m):
+        if max_id > m.max_id:
+            for evs in repo.paginas("evaluaciones_alumnos", "id, alumno_id, nombre_alumno, puntos, fecha", m.desde()):
+                with perfil.medir("seccion", "matriz de progreso", evaluaciones=len(evs)): m.actualizar(roster.con_nombres_actuales(evs))
+        return m
+    m = al_dia(st.session_state.get("matriz_progreso") or MatrizProgreso())
+    if m.n_evaluaciones != d["total"]: m = al_dia(MatrizProgreso())
+    st.session_state.matriz_progreso = m
+    return m
+
+def vista_progreso():
+    roster = cargar_roster()
+    m = matriz_progreso(roster)
+    if not m.alumnos: st.info("Todavía no hay evaluaciones."); return
+    # La matriz identifica a cada alumno por su id (o por el nombre guardado si ya no está en el roster)
+    def etiqueta(k): return roster.por_id[k].etiqueta if k in roster.por_id else str(k)
+    def curso(k): return roster.por_id[k].curso if k in roster.por_id else "—"
+    c_alu, c_dist = st.columns([2, 1])
+    with c_alu:
+        sel = st.selectbox("Alumno", sorted(m.alumnos, key=etiqueta), format_func=etiqueta, key="prog_alumno")
+        st.markdown("**Evolución por ítem**")
+        st.line_chart(m.evolucion_alumno(sel))
+        fila_m, fila_t = m.medias().loc[sel], m.tendencias().loc[sel]
+        st.dataframe(pd.DataFrame({"Media": fila_m, "Tendencia": fila_t}).T.round(2), width="stretch")
+    with c_dist:
+        st.markdown("**Distribución de niveles**")
+        st.bar_chart(m.distribucion())
+    st.markdown("**Media por curso**")
+    st.line_chart(m.evolucion_grupos(curso))
+
+# --- VISTAS: AUTOEVALUACIÓN ---
+AE_POR_PAGINA = 20
+
+def detalle_ae(id_):
+    # Registro completo (ítems y reflexión): solo al editar o imprimir
+    filas = repo.select("autoevaluaciones", filtros=[("eq", "id", id_)])
+    return filas[0] if filas else None
+
+def leer_pagina_ae(filtros=(), n=AE_POR_PAGINA):
+    return repo.select("autoevaluaciones", COLUMNAS_AE, filtros, orden="fecha", desc=True, rango=(0, n - 1))
+
+def historial_ae():
+    # Lista de la sesión: la primera vez se carga una página; después solo los cambios
+    # desde la última marca de 'actualizado' (tras guardar, la tabla cambia de versión y
+    # la consulta devuelve únicamente las filas nuevas o editadas)
+    h = st.session_state.get("historial_ae")
+    if h is None:
+        h = st.session_state.historial_ae = HistorialAE(AE_POR_PAGINA)
+        filtros, n = h.pagina(); h.anadir_pagina(leer_pagina_ae(filtros, n), n)
+    else:
+        h.aplicar_cambios(repo.select("autoevaluaciones", COLUMNAS_AE, h.desde()))
+    return h
+
+def vista_config_ae():
+    it_ae = repo.select("items_autoevaluacion", orden="id")
+    with st.form("n_ae"):
+        n = st.text_input("Nuevo Ítem")
+        if st.form_submit_button("Añadir"):
+            repo.insert("items_autoevaluacion", {"nombre": n}); st.rerun()
+    for i in it_ae:
+        c1, c2 = st.columns([5,1]); c1.write(f"• {i['nombre']}")
+        if c2.button("🗑️", key=f"dae_{i['id']}"):
+            repo.delete("items_autoevaluacion", [("eq", "id", i['id'])]); st.rerun()
+
+def vista_formulario_ae():
+    it_ae = repo.select("items_autoevaluacion", orden="id")
+    es_edicion = st.session_state.edit_id is not None
+    d = detalle_ae(st.session_state.edit_id) if es_edicion else {}
+    if d is None: st.session_state.edit_id = None; st.rerun()  # borrada mientras tanto
+    if es_edicion:
+        st.warning(f"⚠️ Editando SDA {d.get('sda')}")
+        if st.button("❌ Cancelar"): st.session_state.edit_id = None; st.rerun()
+
+    f_v = datetime.fromisoformat(d.get('fecha')) if d.get('fecha') else datetime.now()
+    s_v = int(d.get('sda', 1))
+    it_e_v = {x['nombre']: x for x in d.get('items_evaluados', [])}
+    prefix = "edit" if es_edicion else "new"
+
+    c1, c2 = st.columns(2)
+    f_s = c1.date_input("Fecha", value=f_v, key=f"{prefix}_fecha")
+    s_s = c2.number_input("SDA", 1, 20, value=s_v, key=f"{prefix}_sda")
+
+    eval_ae = []
+    for i in it_ae:
+        st.write(f"**{i['nombre']}**")
+        ca, cb = st.columns([1,4])
+        v_g = it_e_v.get(i['nombre'], {}).get('valor', "No")
+        o_g = it_e_v.get(i['nombre'], {}).get('obs', "")
+        v = ca.radio("OK", ["Sí", "No"], index=0 if v_g=="Sí" else 1, key=f"{prefix}_r_{i['id']}", horizontal=True)
+        o = cb.text_input("Obs", value=o_g, key=f"{prefix}_o_{i['id']}")
+        eval_ae.append({"nombre": i['nombre'], "valor": v, "obs": o})
+
+    r_v = d.get('reflexion_final', {})
+    ref1 = st.text_area("Funciona", r_v.get('funciona', ""), key=f"{prefix}_ref1")
+    ref2 = st.text_area("Dificultades", r_v.get('dificultades', ""), key=f"{prefix}_ref2")
+    ref3 = st.text_area("Mejora", r_v.get('mejoras', ""), key=f"{prefix}_ref3")
+
+    if st.button("💾 Guardar", type="primary"):
+        payload = {"fecha": f_s.isoformat(), "sda": s_s, "items_evaluados": eval_ae, "reflexion_final": {"funciona": ref1, "dificultades": ref2, "mejoras": ref3},
+                   "actualizado": ahora()}
+        if es_edicion: repo.update("autoevaluaciones", payload, [("eq", "id", st.session_state.edit_id)])
+        else: repo.insert("autoevaluaciones", payload)
+        st.session_state.edit_id = None; st.success("Guardado"); st.rerun()
+
+def vista_historial_ae():
+    h = historial_ae()
+    if st.button("🔄 Recargar", key="ae_recargar"):
+        # Vuelve a la primera página (recoge también los borrados hechos desde otra sesión)
+        del st.session_state.historial_ae; st.rerun()
+    for r in h.ordenadas():
+        with st.expander(f"📅 {r['fecha']} - SDA {r['sda']}"):
+            c1, c2, c3 = st.columns(3)
+            if c1.button("🖨️ PDF", key=f"pdf_ae_{r['id']}") and (det := detalle_ae(r['id'])):
+                clave = cola_pdf().enviar(clave_contenido("auto", det), construir_autoevaluacion, det, medir=perfil.etapa("pdf"))
+                st.session_state.pdf_trabajos[f"ae_{r['id']}"] = (clave, f"Auto_{det['fecha']}.pdf")
+            if f"ae_{r['id']}" in st.session_state.pdf_trabajos:
+                with c1: trabajo_pdf(f"ae_{r['id']}", "⬇️ Bajar PDF")
+
+            if c2.button("✏️", key=f"ed_ae_{r['id']}"):
+                st.session_state.edit_id = r['id']
+                st.session_state.vista_pendiente = "📝 Formulario"; st.rerun()
+            if c3.button("🗑️", key=f"del_ae_{r['id']}"):
+                repo.delete("autoevaluaciones", [("eq", "id", r['id'])]); h.quitar(r['id']); st.rerun()
+    if not h.fin and st.button("⬇️ Cargar más", key="ae_mas"):
+        filtros, n = h.pagina(); h.anadir_pagina(leer_pagina_ae(filtros, n), n); st.rerun()
+
+# Cada herramienta es un conjunto de vistas (el orden es el de las pestañas) y las lecturas
+# comunes que se precargan a la vez cuando se muestran todas las pestañas
+HERRAMIENTAS = {
+    "👥 Registro de Alumnos": ("🎓 Registro Aula P.T.", {
+        "👥 Alumnos": vista_alumnos, "⚙️ Ítems": vista_items,
+        "📝 Evaluación": vista_evaluacion, "📅 Histórico": vista_historico, "📈 Progreso": vista_progreso},
+        {"roster": cargar_roster, "items": cargar_items}),
+    "📝 Autoevaluación Práctica": ("📝 Registro de Autoevaluación", {
+        "📝 Formulario": vista_formulario_ae, "📅 Historial": vista_historial_ae,
+        "⚙️ Configurar Ítems": vista_config_ae},
+        {"items_ae": lambda: repo.select("items_autoevaluacion", orden="id"),
+         "regs": leer_pagina_ae}),
+}
+
+with st.sidebar:
+    st.title("🛠️ Menú")
+    opcion = st.radio("Herramienta:", list(HERRAMIENTAS))
+    # Con carga diferida solo se ejecuta la vista activa; sin ella, st.tabs ejecuta todas
+    diferida = st.toggle("⚡ Carga diferida de vistas", value=True)
+    perfilado = st.toggle("🔬 Perfilado por rerun", value=False)
+
+if "edit_id" not in st.session_state: st.session_state.edit_id = None
+if "latencias" not in st.session_state: st.session_state.latencias = {}
+if "pdf_trabajos" not in st.session_state: st.session_state.pdf_trabajos = {}
+
+# Solo se mide si el panel está abierto o hay log configurado
+perfil.iniciar(opcion, activo=perfilado or log_perfil)
+titulo, vistas, precarga = HERRAMIENTAS[opcion]
+cabecera_estilizada(titulo)
+if diferida:
+    # El cambio de vista pedido desde otra vista se aplica antes de crear el selector
+    pendiente = st.session_state.pop("vista_pendiente", None)
+    if pendiente in vistas: st.session_state[f"vista_{opcion}"] = pendiente
+    activa = st.radio("Vista", list(vistas), horizontal=True, key=f"vista_{opcion}", label_visibility="collapsed")
+    with perfil.medir("vista", activa): vistas[activa]()
+else:
+    with perfil.medir("seccion", "precarga"): repo.lote(**precarga)
+    for (nombre, vista), tab in zip(vistas.items(), st.tabs(list(vistas))):
+        with tab, perfil.medir("vista", nombre): vista()
+
+# --- MEDICIÓN DE LATENCIA POR RERUN ---
+ms = perfil.total_ms()
+modo = "diferida" if diferida else "pestañas"
+hist_lat = st.session_state.latencias.setdefault((opcion, modo), [])
+hist_lat.append(ms); del hist_lat[:-20]
+
+with st.sidebar:
+    with st.expander("📊 Rendimiento"):
+        st.caption(f"Último rerun: {ms:.0f} ms ({modo})")
+        for (herr, m), v in st.session_state.latencias.items():
+            st.caption(f"{herr} · {m}: media {sum(v) / len(v):.0f} ms en {len(v)} reruns")
+        c_st = repo.cache.stats()
+        st.caption(f"Caché — aciertos: {c_st['aciertos']} · fallos: {c_st['fallos']} · entradas: {c_st['entradas']}")
+        if perfilado:
+            # Medidas de este rerun (y de los PDF que terminen después), de la más lenta a la más rápida
+            res = perfil.resumen()
+            df_p = pd.DataFrame([(t, n, k, tot, mx) for (t, n), (k, tot, mx) in res.items()],
+                                columns=["Tipo", "Nombre", "Llamadas", "ms", "Máx. ms"])
+            st.dataframe(df_p.sort_values("ms", ascending=False).round(1), hide_index=True, width="stretch")
+            por_tipo = df_p.groupby("Tipo")["ms"].sum()
+            st.caption(" · ".join(f"{t}: {v:.0f} ms" for t, v in por_tipo.items()))
+    if sincronizador:
+        e_sinc = sincronizador.estado()
+        with st.expander(f"🔄 Sincronización ({e_sinc['pendientes']} pendientes)"):
+            if e_sinc['ultimo_error']: st.warning(e_sinc['ultimo_error'])
+            elif e_sinc['ultima_sync']: st.caption(f"Última: {datetime.fromtimestamp(e_sinc['ultima_sync']):%H:%M:%S}")
+            if e_sinc['conflictos']: st.error(f"{e_sinc['conflictos']} operaciones no se pudieron aplicar en Supabase")
+            if st.button("🔄 Sincronizar ahora"): sincronizador.avisar()
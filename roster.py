@@ -0,0 +1,49 @@
+# --- LISTA DE ALUMNOS INDEXADA ---
+# Registros compactos indexados por id y por etiqueta, con el orden de la lista precalculado.
+# Las evaluaciones se enlazan por alumno_id; 'nombre_alumno' queda como copia del nombre
+# en el momento de evaluar (y para las filas antiguas aún sin migrar).
+from dataclasses import dataclass
+
+ORDEN_CURSOS = ["INF 3", "INF 4", "INF 5", "1º", "2º", "3º", "4º", "5º", "6º"]
+_POS_CURSO = {c: k for k, c in enumerate(ORDEN_CURSOS)}
+
+
+@dataclass(frozen=True, slots=True)
+class Alumno:
+    id: int
+    nombre: str
+    curso: str
+
+    @property
+    def etiqueta(self):
+        return f"{self.nombre} ({self.curso})"
+
+
+class Roster:
+    __slots__ = ("alumnos", "por_id", "por_etiqueta")
+
+    def __init__(self, filas):
+        self.alumnos = tuple(sorted((Alumno(f['id'], f['nombre'], f['curso']) for f in filas),
+                                    key=lambda a: (_POS_CURSO.get(a.curso, 999), a.nombre)))
+        self.por_id = {a.id: a for a in self.alumnos}
+        self.por_etiqueta = {a.etiqueta: a for a in self.alumnos}
+
+    def __len__(self):
+        return len(self.alumnos)
+
+    def ids(self):
+        return [a.id for a in self.alumnos]
+
+    def id_de(self, evaluacion):
+        # alumno_id de una evaluación; las filas antiguas se resuelven por el nombre guardado
+        if evaluacion.get('alumno_id') is not None: return evaluacion['alumno_id']
+        a = self.por_etiqueta.get(evaluacion.get('nombre_alumno'))
+        return a.id if a else None
+
+    def etiqueta_de(self, evaluacion):
+        # Nombre actual del alumno (sigue los cambios de nombre o curso)
+        a = self.por_id.get(self.id_de(evaluacion))
+        return a.etiqueta if a else str(evaluacion.get('nombre_alumno', 'Sin Nombre'))
+
+    def con_nombres_actuales(self, evaluaciones):
+        return [{**e, 'alumno_id': self.id_de(e), 'nombre_alumno': self.etiqueta_de(e)} for e in evaluaciones]
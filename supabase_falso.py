@@ -0,0 +1,148 @@
+# --- CLIENTE FALSO DE SUPABASE EN MEMORIA ---
+# Imita la parte del API de supabase-py que usa la app (table().select().eq()...execute())
+# para probar el almacén local, la sincronización y los benchmarks sin red.
+import copy
+import threading
+import time
+from types import SimpleNamespace
+
+# Clave primaria de cada tabla (el resto usan 'id' autoincremental)
+CLAVES = {"configuracion_items": "letra"}
+# Como PostgREST (max-rows): ninguna respuesta trae más filas, pida el rango que pida
+MAX_FILAS = 1000
+
+
+class ErrorRed(ConnectionError):
+    pass
+
+
+class ClienteFalso:
+    def __init__(self, latencia=0.0):
+        self.tablas = {}
+        self.secuencias = {}
+        self.latencia = latencia
+        self.caido = False
+        self.llamadas = 0
+        self.lock = threading.Lock()
+
+    def table(self, nombre):
+        return ConsultaFalsa(self, nombre)
+
+    def sembrar(self, tabla, filas):
+        for f in filas: self._insertar(tabla, dict(f))
+
+    def _insertar(self, tabla, fila):
+        filas = self.tablas.setdefault(tabla, [])
+        if CLAVES.get(tabla, "id") == "id" and fila.get("id") is None:
+            self.secuencias[tabla] = self.secuencias.get(tabla, 0) + 1
+            fila["id"] = self.secuencias[tabla]
+        elif "id" in fila:
+            self.secuencias[tabla] = max(self.secuencias.get(tabla, 0), fila["id"])
+        filas.append(fila)
+        return fila
+
+
+def _cumple(fila, filtros):
+    for op, col, valor in filtros:
+        v = fila.get(col)
+        if op == "eq" and not v == valor: return False
+        if op == "neq" and not v != valor: return False
+        if op == "in_" and v not in valor: return False
+        if op == "is_" and v is not (None if valor == "null" else valor): return False
+        if op in ("gt", "gte", "lt", "lte"):
+            if v is None: return False
+            if op == "gt" and not v > valor: return False
+            if op == "gte" and not v >= valor: return False
+            if op == "lt" and not v < valor: return False
+            if op == "lte" and not v <= valor: return False
+    return True
+
+
+class ConsultaFalsa:
+    def __init__(self, cliente, tabla):
+        self.cliente, self.tabla = cliente, tabla
+        self.accion, self.columnas, self.datos = "select", "*", None
+        self.filtros, self.ordenes, self.rango = [], [], None
+        self.count, self.head = None, False
+
+    def select(self, columnas="*", count=None, head=False):
+        self.columnas, self.count, self.head = columnas, count, head
+        return self
+
+    def insert(self, filas):
+        self.accion, self.datos = "insert", filas; return self
+
+    def upsert(self, filas):
+        self.accion, self.datos = "upsert", filas; return self
+
+    def update(self, datos):
+        self.accion, self.datos = "update", datos; return self
+
+    def delete(self):
+        self.accion = "delete"; return self
+
+    def _filtro(op):
+        def f(self, col, valor):
+            self.filtros.append((op, col, valor)); return self
+        return f
+
+    eq, neq, gt, gte = _filtro("eq"), _filtro("neq"), _filtro("gt"), _filtro("gte")
+    lt, lte, in_, is_ = _filtro("lt"), _filtro("lte"), _filtro("in_"), _filtro("is_")
+    del _filtro
+
+    def order(self, col, desc=False):
+        self.ordenes.append((col, desc)); return self
+
+    def range(self, ini, fin):
+        self.rango = (ini, fin); return self
+
+    def limit(self, n):
+        self.rango = (0, n - 1); return self
+
+    def execute(self):
+        c = self.cliente
+        if c.latencia: time.sleep(c.latencia)
+        with c.lock:
+            c.llamadas += 1
+            if c.caido: raise ErrorRed("Sin conexión con Supabase")
+            datos, n = getattr(self, f"_{self.accion}")(c.tablas.setdefault(self.tabla, []))
+            return SimpleNamespace(data=copy.deepcopy(datos), count=n)
+
+    def _select(self, tabla):
+        res = [f for f in tabla if _cumple(f, self.filtros)]
+        for col, desc in reversed(self.ordenes):
+            res.sort(key=lambda f: (f.get(col) is None, f.get(col)), reverse=desc)
+        n = len(res) if self.count else None
+        if self.head: return [], n
+        ini, fin = self.rango or (0, len(res) - 1)
+        res = res[ini:min(fin + 1, ini + MAX_FILAS)]
+        if self.columnas.strip() != "*":
+            cols = [x.strip() for x in self.columnas.split(",")]
+            res = [{k: f.get(k) for k in cols} for f in res]
+        return res, n
+
+    def _insert(self, tabla):
+        lista = self.datos if isinstance(self.datos, list) else [self.datos]
+        return [dict(self.cliente._insertar(self.tabla, copy.deepcopy(f))) for f in lista], None
+
+    def _upsert(self, tabla):
+        clave = CLAVES.get(self.tabla, "id")
+        res = []
+        for f in (self.datos if isinstance(self.datos, list) else [self.datos]):
+            previa = next((x for x in tabla if f.get(clave) is not None and x.get(clave) == f[clave]), None)
+            if previa is None: previa = self.cliente._insertar(self.tabla, copy.deepcopy(f))
+            else: previa.update(copy.deepcopy(f))
+            res.append(dict(previa))
+        return res, None
+
+    def _update(self, tabla):
+        res = []
+        for f in tabla:
+            if _cumple(f, self.filtros):
+                f.update(copy.deepcopy(self.datos)); res.append(dict(f))
+        return res, None
+
+    def _delete(self, tabla):
+        borradas = [f for f in tabla if _cumple(f, self.filtros)]
+        tabla[:] = [f for f in tabla if not _cumple(f, self.filtros)]
+        return borradas, None
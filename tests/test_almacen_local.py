@@ -0,0 +1,104 @@
+# Almacén local y sincronización contra el cliente falso de Supabase
+import pytest
+
+from almacen_local import AlmacenLocal, Sincronizador
+from supabase_falso import ClienteFalso, ConsultaFalsa
+
+
+class ErrorPostgrest(Exception):
+    # Como postgrest.APIError: el SQLSTATE (o el código de PostgREST) va en 'code'
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+@pytest.fixture
+def cliente():
+    return ClienteFalso()
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenLocal(str(tmp_path / "local.db"))
+
+
+def test_id_temporal_se_reasigna_tambien_en_alumno_id(almacen, cliente):
+    cliente.sembrar("alumnos", [{"nombre": "Previo", "curso": "1º"}])
+    alumno = almacen.insertar("alumnos", {"nombre": "Ana", "curso": "1º"})[0]
+    temporal = alumno["id"]
+    assert temporal < 0
+    almacen.insertar("evaluaciones_alumnos", {"alumno_id": temporal, "nombre_alumno": "Ana (1º)", "fecha": "2026-03-01", "puntos": {"A": 3}})
+    Sincronizador(almacen, cliente).subir()
+
+    remoto = cliente.tablas["alumnos"][-1]["id"]
+    assert remoto == 2
+    assert cliente.tablas["evaluaciones_alumnos"][0]["alumno_id"] == remoto
+    assert almacen.consultar("alumnos", "id, nombre") == [{"id": remoto, "nombre": "Ana"}]
+    assert almacen.consultar("evaluaciones_alumnos", "alumno_id")[0]["alumno_id"] == remoto
+    # La app puede tener aún el id temporal en memoria: lecturas y escrituras lo resuelven
+    assert almacen.consultar("alumnos", "nombre", [("eq", "id", temporal)]) == [{"nombre": "Ana"}]
+    assert almacen.contar("evaluaciones_alumnos", [("eq", "alumno_id", temporal)]) == 1
+    almacen.insertar("evaluaciones_alumnos", {"alumno_id": temporal, "nombre_alumno": "Ana (1º)", "fecha": "2026-03-08", "puntos": {"A": 4}})
+    assert almacen.contar("evaluaciones_alumnos", [("eq", "alumno_id", remoto)]) == 2
+
+
+def test_error_transitorio_se_reintenta(almacen, cliente, monkeypatch):
+    def falla(self, tabla): raise ErrorPostgrest("PGRST301")  # JWT caducado
+    monkeypatch.setattr(ConsultaFalsa, "_insert", falla)
+    almacen.insertar("alumnos", {"nombre": "Ana", "curso": "1º"})
+    sync = Sincronizador(almacen, cliente)
+    assert not sync.sincronizar()
+    assert almacen.n_pendientes() == 1 and almacen.conflictos() == []
+    assert almacen.siguiente()["intentos"] == 1
+    monkeypatch.undo()
+    assert sync.sincronizar()
+    assert almacen.n_pendientes() == 0 and len(cliente.tablas["alumnos"]) == 1
+
+
+def test_rechazo_de_datos_va_a_conflictos(almacen, cliente, monkeypatch):
+    def falla(self, tabla): raise ErrorPostgrest("23503")  # clave ajena
+    monkeypatch.setattr(ConsultaFalsa, "_insert", falla)
+    almacen.insertar("evaluaciones_alumnos", {"alumno_id": 99, "nombre_alumno": "X", "fecha": "2026-03-01", "puntos": {}})
+    assert Sincronizador(almacen, cliente).sincronizar()
+    assert almacen.n_pendientes() == 0
+    assert [c["tabla"] for c in almacen.conflictos()] == ["evaluaciones_alumnos"]
+
+
+def test_bajada_incremental_trae_altas_y_borrados_remotos(almacen, cliente):
+    cliente.sembrar("evaluaciones_alumnos", [{"alumno_id": k % 30, "nombre_alumno": "", "fecha": "2026-03-01", "puntos": {}}
+                                             for k in range(2500)])
+    sync = Sincronizador(almacen, cliente)
+    sync.bajar()
+    assert almacen.contar("evaluaciones_alumnos") == 2500
+
+    cliente.table("evaluaciones_alumnos").delete().in_("id", [5, 1500]).execute()
+    cliente.table("evaluaciones_alumnos").insert({"alumno_id": 1, "nombre_alumno": "", "fecha": "2026-03-08", "puntos": {}}).execute()
+    sync.bajar()
+    ids = {f["id"] for f in almacen.consultar("evaluaciones_alumnos", "id")}
+    assert ids == {f["id"] for f in cliente.tablas["evaluaciones_alumnos"]}
+    assert 5 not in ids and 2501 in ids
+    # Sin cambios no se vuelve a copiar la tabla: solo la consulta de firma de cada tabla grande
+    llamadas = cliente.llamadas
+    sync.bajar()
+    assert almacen.contar("evaluaciones_alumnos") == 2499
+    assert cliente.llamadas - llamadas < 10
+
+
+def test_la_outbox_sobrevive_a_un_corte_de_red(tmp_path, cliente):
+    ruta = str(tmp_path / "local.db")
+    almacen = AlmacenLocal(ruta)
+    cliente.caido = True
+    almacen.insertar("alumnos", {"nombre": "Ana", "curso": "1º"})
+    sync = Sincronizador(almacen, cliente)
+    assert not sync.sincronizar()
+    assert sync.ultimo_error.startswith("Sin conexión")
+    # La app se reinicia sin red: la operación sigue pendiente en disco
+    almacen.db.close()
+    almacen = AlmacenLocal(ruta)
+    assert almacen.n_pendientes() == 1
+    cliente.caido = False
+    sync = Sincronizador(almacen, cliente)
+    assert sync.sincronizar() and sync.ultimo_error is None
+    assert almacen.n_pendientes() == 0
+    assert [a["nombre"] for a in cliente.tablas["alumnos"]] == ["Ana"]
+    assert almacen.consultar("alumnos", "id, nombre") == [{"id": 1, "nombre": "Ana"}]
@@ -0,0 +1,14 @@
+# Matriz de progreso: un alumno cuenta una sola vez aunque tenga filas sin migrar
+from analitica import MatrizProgreso
+from roster import Roster
+
+
+def test_filas_sin_migrar_se_suman_al_alumno():
+    roster = Roster([{"id": 1, "nombre": "Ana", "curso": "1º"}, {"id": 2, "nombre": "Luis", "curso": "2º"}])
+    evs = [{"id": 1, "alumno_id": None, "nombre_alumno": "Ana (1º)", "puntos": {"A": 2}, "fecha": "2026-03-01"},
+           {"id": 2, "alumno_id": 1, "nombre_alumno": "Ana (1º)", "puntos": {"A": 4}, "fecha": "2026-03-08"},
+           {"id": 3, "alumno_id": None, "nombre_alumno": "Pedro (3º)", "puntos": {"A": 1}, "fecha": "2026-03-08"}]
+    m = MatrizProgreso()
+    m.actualizar(roster.con_nombres_actuales(evs))
+    assert sorted(m.alumnos, key=str) == [1, "Pedro (3º)"]
+    assert m.medias().loc[1, "A"] == 3
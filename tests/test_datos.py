@@ -0,0 +1,23 @@
+# Lecturas del repositorio contra el cliente falso de Supabase
+from datos import BackendSupabase, Repositorio
+from supabase_falso import ClienteFalso
+
+
+def test_el_cliente_falso_corta_como_postgrest():
+    cliente = ClienteFalso()
+    cliente.sembrar("alumnos", [{"nombre": f"A{k}", "curso": "1º"} for k in range(1500)])
+    repo = Repositorio(BackendSupabase(cliente))
+    assert len(repo.select("alumnos")) == 1000
+    assert len(repo.select("alumnos", rango=(0, 2999))) == 1000
+    assert len(repo.select("alumnos", rango=(1400, 1499))) == 100
+
+
+def test_paginas_recorre_toda_la_tabla_por_id():
+    cliente = ClienteFalso()
+    cliente.sembrar("evaluaciones_alumnos", [{"alumno_id": k % 7, "fecha": "2026-03-01", "puntos": {}} for k in range(2500)])
+    repo = Repositorio(BackendSupabase(cliente))
+    paginas = list(repo.paginas("evaluaciones_alumnos", "id, alumno_id"))
+    assert [len(p) for p in paginas] == [1000, 1000, 500]
+    assert [f["id"] for p in paginas for f in p] == list(range(1, 2501))
+    # Con filtros: la marca de cada página se suma a ellos
+    assert sum(len(p) for p in repo.paginas("evaluaciones_alumnos", "id", [("eq", "alumno_id", 3), ("gt", "id", 700)])) == 257
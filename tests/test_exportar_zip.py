@@ -0,0 +1,30 @@
+# La exportación ZIP del Histórico: el archivo se genera y se entrega a st.download_button
+import io
+import zipfile
+
+from streamlit.testing.v1 import AppTest
+
+
+def app_zip():
+    import streamlit as st
+    from informes import exportar_zip
+
+    items = [{"letra": "A", "descripcion": "Lectura", "nivel_1": "a", "nivel_2": "b", "nivel_3": "c", "nivel_4": "d"}]
+    evs = {1: [{"alumno_id": 1, "nombre_alumno": "Ana (1º)", "fecha": "2026-03-01", "puntos": {"A": 3}}],
+           None: [{"alumno_id": None, "nombre_alumno": "Pedro (3º)", "fecha": "2026-03-01", "puntos": {"A": 2}}]}
+    autos = [{"id": 7, "fecha": "2026-03-02", "sda": 2, "items_evaluados": [{"nombre": "Planifica", "valor": "Sí", "obs": ""}],
+              "reflexion_final": {"funciona": "Sí"}}]
+    salida = exportar_zip(items, [(1, "Ana (1º)")], lambda i: evs.get(i, []), iter(autos), len(autos), max_procesos=1)
+    # Igual que en vista_historico: el botón recibe los bytes, no el archivo temporal
+    with salida: zip_b = salida.read()
+    st.session_state.zip_b = zip_b
+    st.download_button("⬇️ Descargar ZIP", zip_b, "Informes.zip", "application/zip")
+
+
+def test_zip_se_descarga():
+    at = AppTest.from_function(app_zip, default_timeout=60).run()
+    assert not at.exception
+    assert len(at.get("download_button")) == 1
+    # Los PDF entran en el ZIP según terminan: el orden no está fijado
+    nombres = sorted(zipfile.ZipFile(io.BytesIO(at.session_state.zip_b)).namelist())
+    assert nombres == ["alumnos/Ana _1º__1.pdf", "alumnos/Pedro _3º_.pdf", "autoevaluaciones/SDA2_2026-03-02_7.pdf"]
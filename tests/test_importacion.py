@@ -0,0 +1,34 @@
+# Plan de importación de alumnos: cambios de nombre, intercambios y bajas
+import io
+
+import importacion
+from roster import Roster
+
+ROSTER = Roster([{"id": 1, "nombre": "Ana", "curso": "1º"}, {"id": 2, "nombre": "Luis", "curso": "1º"},
+                 {"id": 3, "nombre": "Eva", "curso": "2º"}])
+
+
+def plan(texto, borrar=False):
+    return importacion.plan_alumnos(importacion.leer_bloques(io.BytesIO(texto.encode("utf-8")), "alumnos.csv"), ROSTER, borrar)
+
+
+def test_renombrar_sobre_otro_alumno_es_error():
+    p = plan("id,nombre,curso\n2,Ana,1º\n")
+    assert not p.valido
+    assert p.errores == [(2, "Ana (1º) ya es el alumno 1")]
+
+
+def test_intercambio_dentro_del_archivo_se_permite():
+    p = plan("id,nombre,curso\n1,Luis,1º\n2,Ana,1º\n3,Eva,2º\n")
+    assert p.valido
+    assert sorted(p.cambios, key=lambda c: c["id"]) == [{"id": 1, "nombre": "Luis", "curso": "1º"},
+                                                        {"id": 2, "nombre": "Ana", "curso": "1º"}]
+    assert p.sin_cambios == 1
+
+
+def test_bajas_por_id_resuelto():
+    # Luis se reconoce por su id aunque cambie de nombre, y Eva por su nombre sin id: solo falta Ana
+    p = plan("id,nombre,curso\n2,Luis Pérez,1º\n,Eva,2º\n", borrar=True)
+    assert p.valido
+    assert p.cambios == [{"id": 2, "nombre": "Luis Pérez", "curso": "1º"}]
+    assert p.bajas == [1]